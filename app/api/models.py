@@ -1,12 +1,34 @@
-from pydantic import BaseModel, StrictStr
-from typing import List
+from pydantic import BaseModel, Field, StrictStr
+from typing import Any, Dict, List, Literal, Optional
 
 class QuestionRequest(BaseModel):
     questions: List[StrictStr]
+    use_cache: bool = True  # Set to False to bypass the answer cache
+    include_timings: bool = False  # Attach a per-node timing breakdown to each answer
+    collection: StrictStr = "default"  # Collection to search
+    retrieval_mode: Optional[Literal["rewrite", "fusion"]] = None  # Defaults to RETRIEVAL_MODE
+    deadline_ms: Optional[float] = Field(None, gt=0)  # Budget for the whole request, defaults to ASK_DEADLINE_MS
 
 class QuestionAnswer(BaseModel):
     question: StrictStr
     answer: StrictStr
+    error: Optional[StrictStr] = None
+    timings: Optional[Dict[str, Any]] = None
+    degradations: Optional[List[StrictStr]] = None  # Work skipped to meet the deadline
+    deadline_missed: Optional[bool] = None
 
 class AnswerResponse(BaseModel):
-    answers : List[QuestionAnswer]
\ No newline at end of file
+    answers : List[QuestionAnswer]
+
+class JobStatus(BaseModel):
+    job_id: StrictStr
+    document_name: StrictStr
+    collection: StrictStr
+    document_id: StrictStr
+    status: StrictStr
+    progress: Dict[str, int]
+    result: Optional[Dict[str, int]] = None
+    error: Optional[StrictStr] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
\ No newline at end of file
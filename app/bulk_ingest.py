@@ -0,0 +1,256 @@
+"""Index every PDF under a directory into a collection.
+
+Files are parsed in the shared process pool and embedded and written by
+several worker threads in large batches, reusing ``VectorStore.index_pdf``.
+Finished files are checkpointed to a JSON Lines manifest, so an interrupted
+run resumes where it stopped.
+
+    python -m app.bulk_ingest /data/archive --collection archive --workers 4
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List
+
+from app.config.logging_config import configure_logging
+from app.config.settings import Settings
+from app.core.pdf_loader import load_in_pool, start_pool
+from app.core.vector_db import DEFAULT_COLLECTION, VectorStore, get_vector_store
+
+settings = Settings()
+logger = configure_logging()
+
+
+def find_pdfs(root: str) -> Iterator[str]:
+    """Absolute paths of the PDFs under ``root``, in a stable order."""
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        for name in sorted(files):
+            if name.lower().endswith(".pdf"):
+                yield os.path.abspath(os.path.join(directory, name))
+
+
+class Manifest:
+    """Append-only JSON Lines record of finished files.
+
+    A file counts as done when an entry with status ``done`` matches its
+    current size and modification time; changed or failed files are indexed
+    again on the next run.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:  # Torn last line of a killed run
+                        continue
+                    if entry.get("status") == "done":
+                        self.done[entry["path"]] = entry
+                    else:
+                        self.done.pop(entry["path"], None)
+
+    @staticmethod
+    def fingerprint(path: str) -> dict:
+        stat = os.stat(path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    def is_done(self, path: str) -> bool:
+        entry = self.done.get(path)
+        return entry is not None and all(
+            entry.get(key) == value for key, value in self.fingerprint(path).items()
+        )
+
+    def append(self, entries: List[dict]):
+        """Durably record finished files."""
+        if not entries:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        for entry in entries:
+            if entry["status"] == "done":
+                self.done[entry["path"]] = entry
+
+
+class BulkIngester:
+    """Index many PDFs into one collection with checkpointed progress."""
+
+    def __init__(
+        self,
+        store: VectorStore,
+        manifest: Manifest,
+        root: str,
+        workers: int,
+        batch_size: int,
+        checkpoint_every: int,
+        checkpoint_seconds: float,
+    ):
+        self.store = store
+        self.manifest = manifest
+        self.root = os.path.abspath(root)
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.checkpoint_seconds = checkpoint_seconds
+        self.totals = {"files": 0, "failed": 0, "pages": 0, "added": 0, "skipped": 0}
+        self._pending: List[dict] = []  # Finished since the last checkpoint
+        self._last_checkpoint = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _index(self, path: str) -> dict:
+        """Parse one file in the process pool, then embed and write it."""
+        start = time.perf_counter()
+        # Relative names keep same-named files in different folders apart
+        document_name = os.path.relpath(path, self.root)
+        entry = {"path": path, "document_name": document_name, **Manifest.fingerprint(path)}
+        pages = {"count": 0}
+
+        def progress(stage: str, count: int):
+            if stage == "pages_parsed":
+                pages["count"] += count
+
+        def parsed():
+            # Submitted on first use, so unchanged files are never parsed
+            yield from load_in_pool(path).result()
+
+        try:
+            result = self.store.index_pdf(
+                path,
+                document_name=document_name,
+                progress=progress,
+                pages=parsed(),
+                batch_size=self.batch_size,
+                save_keyword_index=False,
+                replace=True,  # The directory holds the current version
+            )
+            entry.update(status="done", **result)
+        except Exception as e:
+            logger.error(f"[bulk_ingest] Failed to index '{document_name}': {e}")
+            entry.update(status="failed", error=str(e))
+        entry.update(pages=pages["count"], seconds=round(time.perf_counter() - start, 3))
+        return entry
+
+    def _finish(self, entry: dict):
+        with self._lock:
+            self.totals["files"] += 1
+            self.totals["pages"] += entry["pages"]
+            if entry["status"] == "done":
+                self.totals["added"] += entry.get("added", 0)
+                self.totals["skipped"] += entry.get("skipped", 0)
+            else:
+                self.totals["failed"] += 1
+            self._pending.append(entry)
+
+    def checkpoint(self, force: bool = False):
+        """Persist the keyword index, then record the files it now covers."""
+        due = (
+            len(self._pending) >= self.checkpoint_every
+            or time.monotonic() - self._last_checkpoint >= self.checkpoint_seconds
+        )
+        if not self._pending or not (force or due):
+            return
+        self.store.keyword_index.save()
+        with self._lock:
+            entries, self._pending = self._pending, []
+        self.manifest.append(entries)
+        self._last_checkpoint = time.monotonic()
+        logger.info(
+            f"[bulk_ingest] Checkpoint: {self.totals['files']} files, "
+            f"{self.totals['added']} chunks added"
+        )
+
+    def run(self, paths: List[str]):
+        # At most a few files per worker are parsed ahead of indexing
+        queue = iter(paths)
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="bulk-ingest") as pool:
+            running = set()
+            try:
+                while True:
+                    for path in queue:
+                        running.add(pool.submit(self._index, path))
+                        if len(running) >= self.workers * 2:
+                            break
+                    if not running:
+                        break
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._finish(future.result())
+                    self.checkpoint()
+            except KeyboardInterrupt:
+                logger.warning("[bulk_ingest] Interrupted, finishing files in progress")
+                for future in running:
+                    future.cancel()
+                for future in wait(running).done:
+                    if not future.cancelled():
+                        self._finish(future.result())
+                raise
+            finally:
+                self.checkpoint(force=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", help="Directory searched recursively for PDFs")
+    parser.add_argument("--collection", default=DEFAULT_COLLECTION)
+    parser.add_argument(
+        "--manifest",
+        default=None,
+        help="Checkpoint file (default: ingest_manifest.<collection>.jsonl)",
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Files indexed at once")
+    parser.add_argument("--batch-size", type=int, default=512, help="Chunks per write")
+    parser.add_argument("--checkpoint-every", type=int, default=50, help="Files")
+    parser.add_argument("--checkpoint-seconds", type=float, default=60.0)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    start_pool()
+    manifest = Manifest(args.manifest or f"ingest_manifest.{args.collection}.jsonl")
+    paths = list(find_pdfs(args.directory))
+    todo = [path for path in paths if not manifest.is_done(path)]
+    logger.info(
+        f"[bulk_ingest] {len(paths)} PDFs found, {len(paths) - len(todo)} already "
+        f"done, {len(todo)} to index into '{args.collection}'"
+    )
+
+    ingester = BulkIngester(
+        get_vector_store(args.collection),
+        manifest,
+        args.directory,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        checkpoint_every=args.checkpoint_every,
+        checkpoint_seconds=args.checkpoint_seconds,
+    )
+    start = time.perf_counter()
+    try:
+        ingester.run(todo)
+    except KeyboardInterrupt:
+        raise SystemExit(130)  # Progress is checkpointed; run again to resume
+    finally:
+        elapsed = time.perf_counter() - start
+        totals = ingester.totals
+        print(
+            f"Indexed {totals['files']} files ({totals['failed']} failed), "
+            f"{totals['pages']} pages, {totals['added']} chunks added, "
+            f"{totals['skipped']} unchanged in {elapsed:.1f}s: "
+            f"{totals['files'] / elapsed if elapsed else 0:.2f} files/s, "
+            f"{totals['pages'] / elapsed if elapsed else 0:.1f} pages/s, "
+            f"{totals['added'] / elapsed if elapsed else 0:.1f} chunks/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,164 @@
+import atexit
+import copy
+import json
 import logging
+import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
 from app.config.settings import Settings
 
 settings = Settings()
 
-def configure_logging():
-    """
-    Configure logging for the application.
+# ID of the request being handled, attached to every record logged for it
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+
+
+class _RequestIdFilter(logging.Filter):
+    """Stamp records with the current request ID before they are queued."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get() or "-"
+        return True
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Queue handler that never blocks the caller.
+
+    Messages are rendered and truncated to ``max_chars`` on the calling
+    thread, so the listener only formats and writes. When the queue is full
+    the record is dropped and counted instead of waiting for the listener.
     """
-    # Set log level from settings
-    log_level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
 
-    # Create a custom logger
-    logger = logging.getLogger(__name__)
-    logger.setLevel(log_level)
+    def __init__(self, log_queue: queue.Queue, max_chars: int):
+        super().__init__(log_queue)
+        self.max_chars = max_chars
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = record.getMessage()
+        if self.max_chars and len(message) > self.max_chars:
+            cut = len(message) - self.max_chars
+            message = f"{message[: self.max_chars]}... [{cut} chars truncated]"
+        if record.exc_info and not record.exc_text:
+            # Tracebacks are kept whole; the listener cannot format exc_info
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record = copy.copy(record)
+        record.msg = record.message = message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+            "location": f"{record.filename}:{record.lineno}",
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
 
-    # Create formatters
+def _formatters():
+    if settings.LOG_FORMAT.lower() == "json":
+        formatter = JsonFormatter()
+        return formatter, formatter
     console_formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
     )
     file_formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s - [%(filename)s:%(lineno)d]"
+        "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+        " - [%(filename)s:%(lineno)d]"
     )
+    return console_formatter, file_formatter
 
-    # Create handlers
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(console_formatter)
 
-    # Rotating file handler to limit log file size
-    file_handler = RotatingFileHandler(
-        "app.log", maxBytes=10 * 1024 * 1024, backupCount=5  # 10 MB per file, keep 5 backups
-    )
-    file_handler.setFormatter(file_formatter)
+def _start_listener(queue_handler: QueueHandler, handlers):
+    global _listener
+    queue_handler.queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_listener():
+    """Flush queued records before the interpreter exits."""
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
 
-    # Add handlers to the logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+
+def configure_logging():
+    """
+    Configure logging for the application.
+
+    Safe to call any number of times: the first call installs a queue
+    handler and starts a background thread that writes to stdout and the
+    rotating log file; later calls return the same logger.
+    """
+    logger = logging.getLogger(__name__)
+    with _lock:
+        if _listener is not None:
+            return logger
+
+        # Set log level from settings
+        log_level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
+        logger.setLevel(log_level)
+        logger.propagate = False  # Our handlers write every record exactly once
+
+        console_formatter, file_formatter = _formatters()
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(console_formatter)
+        handlers = [console_handler]
+        if settings.LOG_FILE:
+            # Rotating file handler to limit log file size
+            file_handler = RotatingFileHandler(
+                settings.LOG_FILE, maxBytes=10 * 1024 * 1024, backupCount=5  # 10 MB per file, keep 5 backups
+            )
+            file_handler.setFormatter(file_formatter)
+            handlers.append(file_handler)
+
+        queue_handler = _DroppingQueueHandler(None, settings.LOG_MAX_MESSAGE_CHARS)
+        queue_handler.addFilter(_RequestIdFilter())
+        _start_listener(queue_handler, handlers)
+        logger.addHandler(queue_handler)
+        atexit.register(_stop_listener)
+        # A forked child does not inherit the listener thread; give it its own
+        os.register_at_fork(after_in_child=lambda: _start_listener(queue_handler, handlers))
 
     # Log a message to confirm logging is configured
     logger.info("Logging configured successfully.")
 
-    return logger
\ No newline at end of file
+    return logger
+
+
+def dropped_records() -> int:
+    """Records dropped because the log queue was full."""
+    logger = logging.getLogger(__name__)
+    return sum(
+        handler.dropped
+        for handler in logger.handlers
+        if isinstance(handler, _DroppingQueueHandler)
+    )
@@ -1,6 +1,6 @@
 from dotenv import load_dotenv
 import os
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 load_dotenv()  # Load environment variables from .env
 
@@ -8,9 +8,96 @@ class Settings:
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY", None)
     GROQ_API_KEY: Optional[str] = os.getenv("GROQ_API_KEY", None)
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text")  # "text" or "json" (one object per line)
+    LOG_FILE: str = os.getenv("LOG_FILE", "app.log")  # Empty to log to stdout only
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", 10000))  # Records beyond this are dropped
+    LOG_MAX_MESSAGE_CHARS: int = int(os.getenv("LOG_MAX_MESSAGE_CHARS", 2000))  # 0 to keep whole messages
     FASTAPI_HOST: str = os.getenv("FASTAPI_HOST", "0.0.0.0")
     FASTAPI_PORT: int = int(os.getenv("FASTAPI_PORT", 8000))
+    FASTAPI_RELOAD: bool = os.getenv("FASTAPI_RELOAD", "false").lower() == "true"
+    FASTAPI_WORKERS: int = int(os.getenv("FASTAPI_WORKERS", 1))
+    STARTUP_MODE: str = os.getenv("STARTUP_MODE", "eager")  # eager | lazy
     EMBED_MODEL_NAME: str = "all-MiniLM-L6-v2"
-    PERSIST_DIR: str = "./chroma_db"
+    EMBED_BACKEND: str = os.getenv("EMBED_BACKEND", "huggingface")  # huggingface | onnx
+    EMBED_INFERENCE_BATCH_SIZE: int = int(os.getenv("EMBED_INFERENCE_BATCH_SIZE", 32))
+    EMBED_THREADS: int = int(os.getenv("EMBED_THREADS", 0))  # 0 = runtime default
+    EMBED_MAX_SEQ_LENGTH: int = int(os.getenv("EMBED_MAX_SEQ_LENGTH", 256))
+    # Concurrent query embeddings are batched into one forward pass
+    QUERY_EMBED_BATCHING: bool = os.getenv("QUERY_EMBED_BATCHING", "true").lower() == "true"
+    QUERY_EMBED_MAX_BATCH: int = int(os.getenv("QUERY_EMBED_MAX_BATCH", 32))
+    QUERY_EMBED_MAX_WAIT_MS: float = float(os.getenv("QUERY_EMBED_MAX_WAIT_MS", 5))
+    # Local directory with the ONNX model and tokenizer.json; downloaded from
+    # the model's Hub repository when unset
+    EMBED_ONNX_PATH: Optional[str] = os.getenv("EMBED_ONNX_PATH")
+    EMBED_ONNX_FILE: str = os.getenv("EMBED_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+    PERSIST_DIR: str = os.getenv("PERSIST_DIR", "./chroma_db")
+    MAX_OPEN_COLLECTIONS: int = int(os.getenv("MAX_OPEN_COLLECTIONS", 8))
+    COLLECTION_IDLE_SECONDS: float = float(os.getenv("COLLECTION_IDLE_SECONDS", 1800))
+    CHROMA_MEMORY_LIMIT_MB: int = int(os.getenv("CHROMA_MEMORY_LIMIT_MB", 0))  # 0 = no limit
+    VECTOR_ENGINE: str = os.getenv("VECTOR_ENGINE", "chroma")  # chroma | flat
+    FLAT_INDEX_DIR: str = os.getenv("FLAT_INDEX_DIR", "./flat_index")
+    FLAT_INDEX_DTYPE: str = os.getenv("FLAT_INDEX_DTYPE", "float32")  # float32 | float16
+    KEYWORD_INDEX_PATH: str = os.getenv("KEYWORD_INDEX_PATH", "./keyword_index.json")
     CHUNKING_PARAM: Dict[str, int] = {"size": 300, "overlap": 60}
-    MODEL_NAME: Dict[str, str] = {"gpt": "gpt-4o-mini", "llama": "llama-3.1-8b-instant"}
\ No newline at end of file
+    MODEL_NAME: Dict[str, str] = {"gpt": "gpt-4o-mini", "llama": "llama-3.1-8b-instant"}
+    ASK_CONCURRENCY: int = int(os.getenv("ASK_CONCURRENCY", 4))
+    # Time budget of an /ask request unless it sets deadline_ms; 0 = no deadline
+    ASK_DEADLINE_MS: float = float(os.getenv("ASK_DEADLINE_MS", 0))
+    # Assumed duration of a graph node that has not run yet in this process
+    DEADLINE_NODE_ESTIMATE_SECONDS: float = float(
+        os.getenv("DEADLINE_NODE_ESTIMATE_SECONDS", 1.0)
+    )
+    DEADLINE_GRADE_LIMIT: int = int(os.getenv("DEADLINE_GRADE_LIMIT", 2))  # Chunks graded when short on time
+    GRADING_MODE: str = os.getenv("GRADING_MODE", "sequential")  # sequential | concurrent | single_call
+    GRADING_CONCURRENCY: int = int(os.getenv("GRADING_CONCURRENCY", 4))
+    EMBED_CACHE_DIR: str = os.getenv("EMBED_CACHE_DIR", "./embedding_cache")
+    EMBED_CACHE_MAX_ENTRIES: int = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", 200_000))
+    EMBED_BATCH_SIZE: int = int(os.getenv("EMBED_BATCH_SIZE", 64))
+    INGEST_WORKERS: int = int(os.getenv("INGEST_WORKERS", 2))
+    INGEST_QUEUE_SIZE: int = int(os.getenv("INGEST_QUEUE_SIZE", 8))
+    INGEST_JOBS_DIR: str = os.getenv("INGEST_JOBS_DIR", "./ingest_jobs")  # Job status shared by workers
+    INGEST_PIPELINE_DEPTH: int = int(os.getenv("INGEST_PIPELINE_DEPTH", 2))
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))
+    PDF_PARSE_WORKERS: int = int(os.getenv("PDF_PARSE_WORKERS", os.cpu_count() or 1))
+    PDF_PARALLEL_MIN_PAGES: int = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 50))
+    COALESCE_ENABLED: bool = os.getenv("COALESCE_ENABLED", "true").lower() == "true"
+    ANSWER_CACHE_ENABLED: bool = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+    ANSWER_CACHE_MAX_ENTRIES: int = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", 1000))
+    ANSWER_CACHE_TTL: float = float(os.getenv("ANSWER_CACHE_TTL", 3600))
+    ANSWER_CACHE_SIMILARITY: float = float(os.getenv("ANSWER_CACHE_SIMILARITY", 0.95))
+    CONTEXT_PACKING_ENABLED: bool = (
+        os.getenv("CONTEXT_PACKING_ENABLED", "true").lower() == "true"
+    )
+    CONTEXT_TOKEN_BUDGET: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", 1500))  # 0 = no limit
+    CONTEXT_DEDUPE_THRESHOLD: float = float(os.getenv("CONTEXT_DEDUPE_THRESHOLD", 0.9))
+    CONTEXT_MERGE_GAP: int = int(os.getenv("CONTEXT_MERGE_GAP", 2))  # Characters
+    RETRIEVAL_K: int = int(os.getenv("RETRIEVAL_K", 4))
+    RETRIEVAL_FETCH_K: int = int(os.getenv("RETRIEVAL_FETCH_K", 20))
+    HYBRID_SEARCH_ENABLED: bool = os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true"
+    RETRIEVAL_MODE: str = os.getenv("RETRIEVAL_MODE", "rewrite")  # rewrite | fusion
+    MULTI_QUERY_COUNT: int = int(os.getenv("MULTI_QUERY_COUNT", 3))  # Variants besides the question
+    MULTI_QUERY_TOP_K: int = int(os.getenv("MULTI_QUERY_TOP_K", 6))  # Fused chunks to grade
+    RRF_K: int = int(os.getenv("RRF_K", 60))
+    RRF_WEIGHTS: Dict[str, float] = {
+        "vector": float(os.getenv("RRF_VECTOR_WEIGHT", 1.0)),
+        "keyword": float(os.getenv("RRF_KEYWORD_WEIGHT", 1.0)),
+    }
+    PREGRADE_ENABLED: bool = os.getenv("PREGRADE_ENABLED", "true").lower() == "true"
+    PREGRADE_CROSS_ENCODER: Optional[str] = os.getenv("PREGRADE_CROSS_ENCODER", None)  # e.g. "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    # (accept, reject) thresholds; scores in between are escalated to the LLM grader
+    PREGRADE_SIMILARITY_THRESHOLDS: Tuple[float, float] = (
+        float(os.getenv("PREGRADE_SIMILARITY_ACCEPT", 0.7)),
+        float(os.getenv("PREGRADE_SIMILARITY_REJECT", 0.2)),
+    )
+    PREGRADE_CROSS_ENCODER_THRESHOLDS: Tuple[float, float] = (
+        float(os.getenv("PREGRADE_CROSS_ENCODER_ACCEPT", 0.9)),
+        float(os.getenv("PREGRADE_CROSS_ENCODER_REJECT", 0.1)),
+    )
+    # LLM scheduler; a per-minute limit of 0 disables that bucket
+    LLM_REQUESTS_PER_MINUTE: float = float(os.getenv("LLM_REQUESTS_PER_MINUTE", 0))
+    LLM_TOKENS_PER_MINUTE: float = float(os.getenv("LLM_TOKENS_PER_MINUTE", 0))
+    LLM_TOKEN_OVERHEAD: int = int(os.getenv("LLM_TOKEN_OVERHEAD", 400))  # Prompt template + completion estimate
+    LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", 60))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", 5))
+    LLM_BACKOFF_BASE: float = float(os.getenv("LLM_BACKOFF_BASE", 1.0))
+    LLM_BACKOFF_MAX: float = float(os.getenv("LLM_BACKOFF_MAX", 30.0))
\ No newline at end of file
@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config.settings import Settings
+
+settings = Settings()
+
+
+def normalize_question(question: str) -> str:
+    """Case- and whitespace-insensitive form of a question."""
+    return " ".join(question.lower().split())
+
+
+class SemanticAnswerCache:
+    """TTL + LRU cache of answers keyed on the question and its embedding.
+
+    Lookups try an exact match on the normalized question first, then the most
+    similar cached question above ``similarity_threshold``. Entries belong to
+    an index version and the whole cache is dropped when that version changes.
+    """
+
+    def __init__(
+        self,
+        embed_query: Callable[[str], List[float]],
+        index_version: Callable[[], int],
+        max_entries: int = settings.ANSWER_CACHE_MAX_ENTRIES,
+        ttl: float = settings.ANSWER_CACHE_TTL,
+        similarity_threshold: float = settings.ANSWER_CACHE_SIMILARITY,
+    ):
+        self.embed_query = embed_query
+        self.index_version = index_version
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, str, float]]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None  # Stacked embeddings, rebuilt lazily
+        self._keys: List[str] = []
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _check_version(self):
+        """Drop every entry if the vector store was re-indexed."""
+        version = self.index_version()
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._matrix = None
+            self._version = version
+
+    def _expire(self):
+        now = time.time()
+        expired = [key for key, (_, _, at) in self._entries.items() if now - at > self.ttl]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def get(self, question: str) -> Optional[str]:
+        """Return a cached answer for the question, or None on a miss."""
+        key = normalize_question(question)
+        with self._lock:
+            self._check_version()
+            self._expire()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return self._entries[key][1]
+            if not self._entries:
+                self.misses += 1
+                return None
+
+        vector = self._embed(question)
+        with self._lock:
+            if not self._entries:
+                self.misses += 1
+                return None
+            if self._matrix is None:
+                self._keys = list(self._entries)
+                self._matrix = np.stack([self._entries[k][0] for k in self._keys])
+            similarities = self._matrix @ vector
+            best = int(np.argmax(similarities))
+            best_key = self._keys[best]
+            if (
+                similarities[best] >= self.similarity_threshold
+                and best_key in self._entries
+            ):
+                self._entries.move_to_end(best_key)
+                self.semantic_hits += 1
+                return self._entries[best_key][1]
+            self.misses += 1
+            return None
+
+    def put(self, question: str, answer: str, version: Optional[int] = None):
+        """Cache an answer computed against index ``version``."""
+        key = normalize_question(question)
+        vector = self._embed(question)
+        with self._lock:
+            self._check_version()
+            # Skip answers computed before a concurrent re-index
+            if version is not None and version != self._version:
+                return
+            self._entries[key] = (vector, answer, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and the current cache size."""
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            total = hits + self.misses
+            return {
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": hits / total if total else 0.0,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
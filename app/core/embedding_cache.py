@@ -0,0 +1,137 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List
+
+from langchain_core.embeddings import Embeddings
+
+from app.config.logging_config import configure_logging
+from app.config.settings import Settings
+
+settings = Settings()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper with a persistent, size-bounded LRU cache.
+
+    Document embeddings are keyed by a hash of (model name, chunk text) and
+    stored in a SQLite file, so re-uploaded chunks never hit the model again.
+    Query embeddings are passed straight through to the underlying model.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str = settings.EMBED_MODEL_NAME,
+        cache_dir: str = settings.EMBED_CACHE_DIR,
+        max_entries: int = settings.EMBED_CACHE_MAX_ENTRIES,
+    ):
+        self.logger = configure_logging()
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(
+            os.path.join(cache_dir, "embeddings.sqlite3"), check_same_thread=False
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def _key(self, text: str) -> str:
+        """Content address of a chunk for the current model."""
+        return hashlib.sha256(f"{self.model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Fetch cached vectors for the given keys and mark them as recently used."""
+        found = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                batch,
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = array("f", blob).tolist()
+            if rows:
+                self._conn.execute(
+                    f"UPDATE embeddings SET last_used = ? WHERE key IN ({placeholders})",
+                    [time.time(), *batch],
+                )
+        return found
+
+    def _store(self, entries: Dict[str, List[float]]):
+        """Insert new vectors and evict the least recently used beyond the bound."""
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+            [(key, array("f", vector).tobytes(), now) for key, vector in entries.items()],
+        )
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = self._size - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN ("
+                "SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (overflow,),
+            )
+            self._size -= overflow
+            self.logger.debug(f"[CachedEmbeddings] Evicted {overflow} cached embeddings")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, computing only the chunks not already cached."""
+        keys = [self._key(text) for text in texts]
+        with self._lock:
+            cached = self._lookup(list(set(keys)))
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        computed = {}
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+
+        with self._lock:
+            if computed:
+                self._store(computed)
+            self._conn.commit()
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        self.logger.debug(
+            f"[CachedEmbeddings] {len(texts) - len(missing)} hits, {len(missing)} misses"
+        )
+        return [cached[key] if key in cached else computed[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query without caching."""
+        return self.embeddings.embed_query(text)
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and the current cache size."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": self._size,
+            "max_entries": self.max_entries,
+        }
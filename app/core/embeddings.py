@@ -0,0 +1,163 @@
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.config.logging_config import configure_logging
+from app.config.settings import Settings
+
+settings = Settings()
+
+
+def _hub_repo(model_name: str) -> str:
+    """Hugging Face Hub repository of a sentence-transformers model name."""
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+class OnnxEmbeddings(Embeddings):
+    """Sentence embeddings computed with ONNX Runtime on CPU.
+
+    Runs an exported (typically int8-quantized) transformer, then applies the
+    same mean pooling and L2 normalization as the sentence-transformers model.
+    ``model_path`` is a local directory holding ``model_file`` and
+    ``tokenizer.json``; without it both are fetched from the Hub repository of
+    ``model_name``.
+    """
+
+    def __init__(
+        self,
+        model_name: str = settings.EMBED_MODEL_NAME,
+        model_path: Optional[str] = settings.EMBED_ONNX_PATH,
+        model_file: str = settings.EMBED_ONNX_FILE,
+        batch_size: int = settings.EMBED_INFERENCE_BATCH_SIZE,
+        threads: int = settings.EMBED_THREADS,
+        max_length: int = settings.EMBED_MAX_SEQ_LENGTH,
+    ):
+        # onnxruntime and tokenizers ship with chromadb, but only load them
+        # when this backend is selected
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self.logger = configure_logging()
+        self.batch_size = max(1, batch_size)
+        model, tokenizer = self._resolve(model_name, model_path, model_file)
+
+        options = onnxruntime.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        self.session = onnxruntime.InferenceSession(
+            model, options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(tokenizer)
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()  # Pads to the longest text in each batch
+        self.logger.info(
+            f"[OnnxEmbeddings] Loaded {model} (threads={threads or 'auto'})"
+        )
+
+    @staticmethod
+    def _resolve(model_name: str, model_path: Optional[str], model_file: str):
+        """Local paths of the ONNX model and its tokenizer."""
+        if model_path:
+            return (
+                os.path.join(model_path, model_file),
+                os.path.join(model_path, "tokenizer.json"),
+            )
+        from huggingface_hub import hf_hub_download
+
+        repo = _hub_repo(model_name)
+        return (
+            hf_hub_download(repo, model_file),
+            hf_hub_download(repo, "tokenizer.json"),
+        )
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": attention_mask,
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        feed = {name: inputs[name] for name in self.input_names if name in inputs}
+        hidden = self.session.run(None, feed)[0]
+        # Mean pooling over real tokens, then unit length
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        # Batch texts of similar length together to minimize padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start : start + self.batch_size]
+            batch = self._embed_batch([texts[i] for i in indices])
+            for i, vector in zip(indices, batch):
+                vectors[i] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed_batch([text])[0].tolist()
+
+
+def get_embeddings(
+    backend: str = settings.EMBED_BACKEND,
+    model_name: str = settings.EMBED_MODEL_NAME,
+    batch_size: int = settings.EMBED_INFERENCE_BATCH_SIZE,
+    threads: int = settings.EMBED_THREADS,
+) -> Embeddings:
+    """Build the embedding backend selected in Settings."""
+    if backend == "onnx":
+        return OnnxEmbeddings(
+            model_name=model_name, batch_size=batch_size, threads=threads
+        )
+    if backend == "huggingface":
+        from langchain_huggingface.embeddings.huggingface import HuggingFaceEmbeddings
+
+        if threads > 0:
+            import torch
+
+            torch.set_num_threads(threads)
+        return HuggingFaceEmbeddings(
+            model_name=model_name, encode_kwargs={"batch_size": batch_size}
+        )
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+def cache_namespace(
+    backend: str = settings.EMBED_BACKEND, model_name: str = settings.EMBED_MODEL_NAME
+) -> str:
+    """Embedding cache namespace, so vectors from different backends never mix."""
+    if backend == "huggingface":
+        return model_name
+    if backend == "onnx":
+        return f"{model_name}:onnx:{settings.EMBED_ONNX_FILE}"
+    return f"{model_name}:{backend}"
+
+
+def parity_check(
+    candidate: Embeddings, reference: Embeddings, texts: List[str]
+) -> Dict[str, float]:
+    """Cosine agreement between two embedders on the same texts."""
+    a = np.asarray(candidate.embed_documents(texts), dtype=np.float32)
+    b = np.asarray(reference.embed_documents(texts), dtype=np.float32)
+    cosine = (a * b).sum(axis=1) / (
+        np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+    )
+    return {
+        "texts": len(texts),
+        "mean_cosine": round(float(cosine.mean()), 6),
+        "min_cosine": round(float(cosine.min()), 6),
+        "p05_cosine": round(float(np.percentile(cosine, 5)), 6),
+    }
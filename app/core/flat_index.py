@@ -0,0 +1,400 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.config.settings import Settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within a process
+    fcntl = None
+
+settings = Settings()
+
+# One row per stored chunk; ``offset`` and ``length`` locate its JSON record
+ROW_DTYPE = np.dtype(
+    [
+        ("id", "S64"),
+        ("document_id", "S32"),
+        ("offset", "<i8"),
+        ("length", "<i4"),
+        ("live", "?"),
+    ]
+)
+MIN_CAPACITY = 1024
+SCORE_BLOCK_ROWS = 65536  # float16 rows converted to float32 at a time
+COMPACT_MIN_DEAD = 1024
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class _Snapshot:
+    """Arrays and record file of one published state, read without locking."""
+
+    def __init__(self, state: dict, vectors, rows, records):
+        self.state = state
+        self.count = state["count"]
+        self.vectors = vectors
+        self.rows = rows
+        self.records = records
+        self.read_lock = threading.Lock()  # Guards seek + read on ``records``
+
+
+class FlatIndex:
+    """Exact cosine search over memory-mapped, normalized embeddings.
+
+    A collection is a directory with ``index.json`` (row count, dimension,
+    dtype and file version), a ``vectors`` matrix, a ``rows`` table of chunk
+    IDs, document IDs, liveness and record locations, and a JSON Lines
+    ``records`` file with each chunk's text and metadata. Readers map the
+    arrays read-only, so processes serving the same collection share its
+    pages through the page cache and opening costs a few header reads.
+
+    Writers append rows past the published count and publish them by
+    atomically replacing ``index.json``; a file lock serializes writers
+    across processes. Deleted and replaced rows are only marked dead, and
+    the files are rewritten without them when they fill up or are mostly dead.
+    """
+
+    def __init__(self, directory: str, dtype: str = settings.FLAT_INDEX_DTYPE):
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported flat index dtype: {dtype}")
+        self.directory = directory
+        self.dtype = dtype  # For new indexes; an existing one keeps its own
+        self._index_path = os.path.join(directory, "index.json")
+        self._snapshot: Optional[_Snapshot] = None
+        self._stamp = None
+        self._ids: Dict[str, int] = {}  # Chunk ID -> latest row
+        self._ids_count = 0
+        self._ids_version = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._refresh()
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        return os.path.exists(os.path.join(directory, "index.json"))
+
+    def stamp(self) -> Optional[Tuple[int, int, int]]:
+        """Identity of the published state; changes on every write by any process."""
+        try:
+            stat = os.stat(self._index_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    @property
+    def itemsize(self) -> int:
+        snapshot = self._current()
+        return np.dtype(snapshot.state["dtype"] if snapshot else self.dtype).itemsize
+
+    def _path(self, name: str, version: int) -> str:
+        extension = "jsonl" if name == "records" else "npy"
+        return os.path.join(self.directory, f"{name}.{version}.{extension}")
+
+    def _refresh(self):
+        """Remap the files if a writer published a new state."""
+        for _ in range(3):
+            try:
+                stat = os.stat(self._index_path)
+            except FileNotFoundError:
+                return
+            stamp = (stat.st_ino, stat.st_mtime_ns)
+            if stamp == self._stamp:
+                return
+            try:
+                with open(self._index_path, encoding="utf-8") as f:
+                    state = json.load(f)
+                self._load(state)
+            except FileNotFoundError:  # Rewritten between the two reads
+                continue
+            self._stamp = stamp
+            return
+
+    def _load(self, state: dict):
+        current = self._snapshot
+        if current is not None and current.state["version"] == state["version"]:
+            # Appends reuse the mapped files; only the row count moved
+            snapshot = _Snapshot(state, current.vectors, current.rows, current.records)
+            snapshot.read_lock = current.read_lock
+        else:
+            version = state["version"]
+            snapshot = _Snapshot(
+                state,
+                np.load(self._path("vectors", version), mmap_mode="r"),
+                np.load(self._path("rows", version), mmap_mode="r"),
+                open(self._path("records", version), "rb"),
+            )
+        with self._lock:
+            self._snapshot = snapshot
+
+    def _current(self) -> Optional[_Snapshot]:
+        self._refresh()
+        return self._snapshot
+
+    def _id_rows(self, snapshot: _Snapshot) -> Dict[str, int]:
+        """Chunk ID to row map, built on first use and extended as rows are added."""
+        with self._lock:
+            if self._ids_version != snapshot.state["version"]:
+                # Row numbers changed in a rewrite
+                self._ids, self._ids_count = {}, 0
+                self._ids_version = snapshot.state["version"]
+            if self._ids_count < snapshot.count:
+                ids = snapshot.rows["id"][self._ids_count : snapshot.count]
+                for row, chunk_id in enumerate(ids, start=self._ids_count):
+                    self._ids[chunk_id.decode()] = row
+                self._ids_count = snapshot.count
+            return self._ids
+
+    def _live(self, snapshot: _Snapshot) -> np.ndarray:
+        return snapshot.rows["live"][: snapshot.count]
+
+    def _read(self, snapshot: _Snapshot, rows: Sequence[int]) -> List[dict]:
+        records = []
+        with snapshot.read_lock:
+            for row in rows:
+                entry = snapshot.rows[row]
+                snapshot.records.seek(int(entry["offset"]))
+                records.append(json.loads(snapshot.records.read(int(entry["length"]))))
+        return records
+
+    def count(self) -> int:
+        snapshot = self._current()
+        return int(self._live(snapshot).sum()) if snapshot else 0
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        document_id: Optional[str] = None,
+        include: Sequence[str] = ("metadatas",),
+    ) -> Dict[str, list]:
+        """Stored chunks by ID, by document, or all of them, like Chroma's ``get``."""
+        snapshot = self._current()
+        result = {"ids": [], "documents": [], "metadatas": []}
+        if snapshot is None:
+            return result
+        live = self._live(snapshot)
+        if ids is not None:
+            id_rows = self._id_rows(snapshot)
+            rows = [id_rows[i] for i in ids if i in id_rows and live[id_rows[i]]]
+        elif document_id is not None:
+            matches = snapshot.rows["document_id"][: snapshot.count] == document_id.encode()
+            rows = np.nonzero(matches & live)[0]
+        else:
+            rows = np.nonzero(live)[0]
+        for record in self._read(snapshot, rows):
+            result["ids"].append(record["id"])
+            result["documents"].append(record["document"])
+            result["metadatas"].append(record["metadata"])
+        return {key: value for key, value in result.items() if key == "ids" or key in include}
+
+    def _scores(self, vectors: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every query (rows) to every vector (columns)."""
+        if vectors.dtype == np.float32:
+            return queries @ vectors.T
+        scores = np.empty((len(queries), len(vectors)), dtype=np.float32)
+        for start in range(0, len(vectors), SCORE_BLOCK_ROWS):
+            block = np.asarray(vectors[start : start + SCORE_BLOCK_ROWS], dtype=np.float32)
+            scores[:, start : start + len(block)] = queries @ block.T
+        return scores
+
+    def query(
+        self, embeddings: Sequence[Sequence[float]], k: int
+    ) -> List[List[Tuple[Document, float]]]:
+        """Exact top ``k`` chunks and cosine similarities for each query vector."""
+        snapshot = self._current()
+        if snapshot is None or not snapshot.count or not len(embeddings):
+            return [[] for _ in embeddings]
+        queries = _normalize(np.asarray(embeddings, dtype=np.float32))
+        scores = self._scores(snapshot.vectors[: snapshot.count], queries)
+        live = self._live(snapshot)
+        scores[:, ~live] = -np.inf
+        k = min(k, int(live.sum()))
+        if k <= 0:
+            return [[] for _ in embeddings]
+
+        # Partition for the top k in O(n), then sort only those k
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for query_scores, candidates in zip(scores, top):
+            ranked = candidates[np.argsort(-query_scores[candidates], kind="stable")]
+            records = self._read(snapshot, ranked)
+            results.append(
+                [
+                    (
+                        Document(
+                            id=record["id"],
+                            page_content=record["document"],
+                            metadata=record["metadata"],
+                        ),
+                        float(query_scores[row]),
+                    )
+                    for row, record in zip(ranked, records)
+                ]
+            )
+        return results
+
+    @contextmanager
+    def _writing(self):
+        """Hold the write lock of this collection, across threads and processes."""
+        with self._write_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, "write.lock"), "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._refresh()  # Another process may have written
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _publish(self, state: dict):
+        """Atomically make ``state`` the current index."""
+        temporary = self._index_path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self._index_path)
+        self._refresh()
+
+    def _rewrite(self, capacity: int, dim: int, dtype: str):
+        """Copy the live rows into a new file version with room for ``capacity``."""
+        snapshot = self._snapshot
+        version = snapshot.state["version"] + 1 if snapshot else 1
+        live_rows = np.nonzero(self._live(snapshot))[0] if snapshot else []
+        count = len(live_rows)
+        capacity = max(capacity, count, MIN_CAPACITY)
+
+        vectors = np.lib.format.open_memmap(
+            self._path("vectors", version), mode="w+", dtype=dtype, shape=(capacity, dim)
+        )
+        rows = np.lib.format.open_memmap(
+            self._path("rows", version), mode="w+", dtype=ROW_DTYPE, shape=(capacity,)
+        )
+        with open(self._path("records", version), "wb") as records:
+            if count:
+                vectors[:count] = snapshot.vectors[live_rows]
+                rows[:count] = snapshot.rows[live_rows]
+                for row, record in enumerate(self._read(snapshot, live_rows)):
+                    line = json.dumps(record).encode("utf-8") + b"\n"
+                    rows["offset"][row], rows["length"][row] = records.tell(), len(line)
+                    records.write(line)
+            records.flush()
+            os.fsync(records.fileno())
+        vectors.flush()
+        rows.flush()
+        del vectors, rows
+
+        self._publish({"version": version, "count": count, "dim": dim, "dtype": dtype})
+        if snapshot:
+            # Readers still mapping the old files keep them until they remap
+            for name in ("vectors", "rows", "records"):
+                os.remove(self._path(name, version - 1))
+
+    def _append(self, ids, embeddings, metadatas, documents):
+        """Append chunks as new rows and retire the rows they replace."""
+        if any(len(chunk_id.encode()) > ROW_DTYPE["id"].itemsize for chunk_id in ids):
+            raise ValueError("Chunk IDs are limited to 64 bytes")
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        snapshot = self._snapshot
+        if snapshot is None:
+            self._rewrite(2 * len(ids), vectors.shape[1], self.dtype)
+        else:
+            state = snapshot.state
+            if vectors.shape[1] != state["dim"]:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match the "
+                    f"index dimension {state['dim']}"
+                )
+            if state["count"] + len(ids) > len(snapshot.vectors):
+                live = int(self._live(snapshot).sum())
+                self._rewrite(2 * (live + len(ids)), state["dim"], state["dtype"])
+        snapshot = self._snapshot
+        state = snapshot.state
+        start, end = state["count"], state["count"] + len(ids)
+        replaced = [row for row in map(self._id_rows(snapshot).get, ids) if row is not None]
+
+        new_rows = np.zeros(len(ids), dtype=ROW_DTYPE)
+        with open(self._path("records", state["version"]), "ab") as records:
+            for i, (chunk_id, metadata, text) in enumerate(zip(ids, metadatas, documents)):
+                line = json.dumps(
+                    {"id": chunk_id, "document": text, "metadata": metadata or {}}
+                ).encode("utf-8") + b"\n"
+                new_rows[i] = (
+                    chunk_id.encode(),
+                    str((metadata or {}).get("document_id", "")).encode(),
+                    records.tell(),
+                    len(line),
+                    True,
+                )
+                records.write(line)
+            records.flush()
+            os.fsync(records.fileno())
+        stored = np.load(self._path("vectors", state["version"]), mmap_mode="r+")
+        stored[start:end] = vectors
+        stored.flush()
+        rows = np.load(self._path("rows", state["version"]), mmap_mode="r+")
+        rows[start:end] = new_rows
+        rows.flush()
+        self._publish({**state, "count": end})
+        # Retire replaced rows only once their replacements are visible
+        if replaced:
+            rows["live"][replaced] = False
+            rows.flush()
+
+    def upsert(self, ids, embeddings, metadatas, documents):
+        if not ids:
+            return
+        with self._writing():
+            self._append(ids, embeddings, metadatas, documents)
+
+    def update_metadatas(self, ids, metadatas):
+        """Replace the metadata of stored chunks, keeping their vectors and text."""
+        with self._writing():
+            snapshot = self._snapshot
+            if snapshot is None:
+                return
+            id_rows, live = self._id_rows(snapshot), self._live(snapshot)
+            found = [
+                (id_rows[i], metadata)
+                for i, metadata in zip(ids, metadatas)
+                if i in id_rows and live[id_rows[i]]
+            ]
+            if not found:
+                return
+            rows = [row for row, _ in found]
+            records = self._read(snapshot, rows)
+            self._append(
+                [record["id"] for record in records],
+                np.asarray(snapshot.vectors[rows], dtype=np.float32),
+                [metadata for _, metadata in found],
+                [record["document"] for record in records],
+            )
+
+    def delete(self, ids):
+        with self._writing():
+            snapshot = self._snapshot
+            if snapshot is None:
+                return
+            id_rows = self._id_rows(snapshot)
+            rows = [id_rows[i] for i in ids if i in id_rows]
+            if not rows:
+                return
+            stored = np.load(self._path("rows", snapshot.state["version"]), mmap_mode="r+")
+            stored["live"][rows] = False
+            stored.flush()
+            live = int(self._live(snapshot).sum())
+            dead = snapshot.count - live
+            if dead >= COMPACT_MIN_DEAD and dead > live:
+                state = snapshot.state
+                self._rewrite(2 * live, state["dim"], state["dtype"])
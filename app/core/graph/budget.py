@@ -0,0 +1,72 @@
+import math
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from app.config.settings import Settings
+from app.core.metrics import LLM_CALL_DURATION, NODE_DURATION, registry
+
+settings = Settings()
+
+# Deadline of the question being answered, for code outside the graph state
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when work cannot start before the request deadline."""
+
+
+DEGRADATIONS = registry.counter(
+    "agentrag_degradations_total",
+    "Work skipped to answer within a request deadline.",
+    ["kind"],
+)
+DEADLINES_MISSED = registry.counter(
+    "agentrag_deadlines_missed_total", "Questions answered after their deadline."
+)
+
+
+def deadline_after(budget_ms: Optional[float]) -> Optional[float]:
+    """Monotonic deadline ``budget_ms`` from now, or None without a budget."""
+    if not budget_ms or budget_ms <= 0:
+        return None
+    return time.monotonic() + budget_ms / 1000
+
+
+def remaining(state: dict) -> float:
+    """Seconds left until the state's deadline (infinite without one)."""
+    deadline = state.get("deadline")
+    return math.inf if deadline is None else deadline - time.monotonic()
+
+
+def expected_seconds(*nodes: str) -> float:
+    """Typical time to run ``nodes``, from their mean duration in this process."""
+    total = 0.0
+    for node in nodes:
+        mean = NODE_DURATION.mean(node=node)
+        total += settings.DEADLINE_NODE_ESTIMATE_SECONDS if mean is None else mean
+    return total
+
+
+def expected_call_seconds(lane: str) -> float:
+    """Typical duration of one LLM call in a scheduler lane."""
+    mean = LLM_CALL_DURATION.mean(lane=lane)
+    return settings.DEADLINE_NODE_ESTIMATE_SECONDS if mean is None else mean
+
+
+def can_afford(state: dict, *nodes: str) -> bool:
+    """Whether ``nodes`` typically finish before the state's deadline."""
+    return remaining(state) >= expected_seconds(*nodes)
+
+
+def llm_timeout(state: dict) -> float:
+    """LLM call timeout: LLM_TIMEOUT, capped at the time left before the deadline."""
+    return max(0.0, min(settings.LLM_TIMEOUT, remaining(state)))
+
+
+def degrade(state: dict, kind: str):
+    """Record that ``kind`` of work was skipped to meet the deadline."""
+    degradations = state.setdefault("degradations", [])
+    if kind not in degradations:
+        degradations.append(kind)
+        DEGRADATIONS.inc(kind=kind)
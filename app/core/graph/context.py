@@ -0,0 +1,151 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.config.settings import Settings
+
+settings = Settings()
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def estimate_text_tokens(text: str) -> int:
+    """Rough token count of a text (about four characters per token)."""
+    return len(text) // 4
+
+
+class _Block:
+    """A span of one page assembled from one or more retrieved chunks."""
+
+    def __init__(self, text: str, source: dict, relevant: bool, rank: int):
+        self.text = text
+        self.document_id = source.get("document_id")
+        self.document_name = source.get("document_name")
+        self.page = source.get("page")
+        self.start = source.get("start_index")
+        self.score = source.get("score")
+        self.relevant = relevant
+        self.rank = rank  # Position in retrieval order, the tie-breaker
+
+    @property
+    def end(self) -> Optional[int]:
+        return None if self.start is None else self.start + len(self.text)
+
+    def absorb(self, other: "_Block"):
+        """Extend this block with a chunk that overlaps or follows it."""
+        overlap = self.end - other.start
+        if overlap < len(other.text):
+            separator = "" if overlap >= 0 else " "
+            self.text += separator + other.text[max(overlap, 0) :]
+        self.relevant = self.relevant or other.relevant
+        self.rank = min(self.rank, other.rank)
+        if other.score is not None:
+            self.score = max(other.score, self.score or other.score)
+
+    def sort_key(self):
+        # Relevant chunks first, then by retrieval score, then retrieval order
+        score = self.score if self.score is not None else float("-inf")
+        return (not self.relevant, -score, self.rank)
+
+    def header(self) -> str:
+        name = self.document_name or self.document_id or "document"
+        return name if self.page is None else f"{name} p.{self.page + 1}"
+
+
+def _merge(blocks: List[_Block], max_gap: int) -> Tuple[List[_Block], int]:
+    """Merge same-page chunks that overlap or are at most ``max_gap`` apart."""
+    merged, count = [], 0
+    positioned = sorted(
+        (b for b in blocks if b.start is not None and b.document_id is not None),
+        key=lambda b: (b.document_id, b.page, b.start),
+    )
+    for block in positioned:
+        previous = merged[-1] if merged else None
+        if (
+            previous is not None
+            and previous.document_id == block.document_id
+            and previous.page == block.page
+            and block.start <= previous.end + max_gap
+        ):
+            previous.absorb(block)
+            count += 1
+        else:
+            merged.append(block)
+    merged.extend(b for b in blocks if b.start is None or b.document_id is None)
+    return merged, count
+
+
+def _near_duplicate(words: set, kept: List[set], threshold: float) -> bool:
+    """Whether most of the smaller word set is contained in a kept block."""
+    for other in kept:
+        smaller = min(len(words), len(other))
+        if smaller and len(words & other) / smaller >= threshold:
+            return True
+    return False
+
+
+def pack_context(
+    documents: List[str],
+    grades: Optional[List[str]] = None,
+    sources: Optional[List[dict]] = None,
+    token_budget: int = settings.CONTEXT_TOKEN_BUDGET,
+    dedupe_threshold: float = settings.CONTEXT_DEDUPE_THRESHOLD,
+    max_gap: int = settings.CONTEXT_MERGE_GAP,
+) -> Tuple[str, Dict[str, int]]:
+    """Assemble retrieved chunks into a compact, budgeted prompt context.
+
+    Chunks from the same page that overlap or sit next to each other are
+    merged, near-duplicate blocks are dropped, and the rest are ordered by
+    grade and retrieval score and added until ``token_budget`` is reached.
+    Returns the context text and token/chunk counts, including the tokens
+    saved relative to the raw chunk list.
+    """
+    grades = grades or []
+    sources = sources or []
+    blocks = [
+        _Block(
+            text,
+            sources[i] if i < len(sources) else {},
+            i < len(grades) and str(grades[i]).lower() == "yes",
+            i,
+        )
+        for i, text in enumerate(documents)
+    ]
+    blocks, merged = _merge(blocks, max_gap)
+    blocks.sort(key=_Block.sort_key)
+
+    kept, kept_words, duplicates = [], [], 0
+    for block in blocks:
+        words = set(_WORD_PATTERN.findall(block.text.lower()))
+        if _near_duplicate(words, kept_words, dedupe_threshold):
+            duplicates += 1
+            continue
+        kept.append(block)
+        kept_words.append(words)
+
+    sections, used, over_budget = [], 0, 0
+    for block in kept:
+        section = f"[{len(sections) + 1}] {block.header()}\n{block.text}"
+        tokens = estimate_text_tokens(section)
+        if token_budget > 0 and used + tokens > token_budget:
+            if sections:
+                over_budget += 1
+                continue
+            # Never send an empty context: cut the best block down to size
+            section = section[: token_budget * 4].rsplit(" ", 1)[0]
+            tokens = estimate_text_tokens(section)
+        sections.append(section)
+        used += tokens
+
+    context = "\n\n".join(sections)
+    raw_tokens = estimate_text_tokens(str(documents))
+    packed_tokens = estimate_text_tokens(context)
+    return context, {
+        "chunks": len(documents),
+        "blocks": len(sections),
+        "merged": merged,
+        "duplicates": duplicates,
+        "over_budget": over_budget,
+        "raw_tokens": raw_tokens,
+        "packed_tokens": packed_tokens,
+        "tokens_saved": max(0, raw_tokens - packed_tokens),
+    }
@@ -1,6 +1,7 @@
 from langchain_groq import ChatGroq
 from langchain_openai import ChatOpenAI
 from app.config.settings import Settings
+from app.core.metrics import LLMUsageCallback
 from typing import Union
 
 settings = Settings()
@@ -14,14 +15,16 @@ def get_llm(temperature: float = 0.0) -> Union[ChatGroq, ChatOpenAI]:
             model=settings.MODEL_NAME.get('gpt'),
             temperature=temperature,
             max_tokens=None,
-            timeout=None,
-            max_retries=3,
+            timeout=settings.LLM_TIMEOUT,
+            max_retries=0,  # Retries are handled by the LLM scheduler
+            callbacks=[LLMUsageCallback()],
         )
 
     return ChatGroq(
         model=settings.MODEL_NAME.get('llama'),
         temperature=temperature,
         max_tokens=None,
-        timeout=None,
-        max_retries=3,
+        timeout=settings.LLM_TIMEOUT,
+        max_retries=0,  # Retries are handled by the LLM scheduler
+        callbacks=[LLMUsageCallback()],
     )
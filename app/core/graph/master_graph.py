@@ -1,28 +1,169 @@
-from typing import Literal
-
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Literal, Optional, Tuple
+
+from langchain_core.documents import Document
 from langchain_core.output_parsers import StrOutputParser
 from langgraph.graph import END, StateGraph
 from pydantic import BaseModel, Field
 
+from app.config.logging_config import configure_logging
+from app.config.settings import Settings
+from app.core.answer_cache import SemanticAnswerCache, normalize_question
+from app.core.graph.budget import (
+    DEADLINES_MISSED,
+    DeadlineExceeded,
+    can_afford,
+    degrade,
+    expected_call_seconds,
+    expected_seconds,
+    llm_timeout,
+    remaining,
+    request_deadline,
+)
+from app.core.graph.context import pack_context
 from app.core.graph.llm import get_llm
+from app.core.graph.pregrader import TieredPreGrader
+from app.core.graph.scheduler import scheduled
 from app.core.graph.prompts import (
     get_answer_prompt,
+    get_batch_grade_prompt,
     get_grade_prompt,
+    get_multi_query_prompt,
     get_rewrite_prompt,
 )
 from app.core.graph.state import AgentState
-from app.core.vector_db import VectorStore
+from app.core.metrics import (
+    CONTEXT_TOKENS,
+    QUESTIONS,
+    REWRITE_LOOPS,
+    instrument_node,
+    registry,
+    request_timings,
+)
+from app.core.keyword_index import reciprocal_rank_fusion
+from app.core.singleflight import SingleFlight
+from app.core.vector_db import (
+    DEFAULT_COLLECTION,
+    VectorStore,
+    get_vector_store,
+    shared_query_embedder,
+)
+
+settings = Settings()
+logger = configure_logging()
 
-# Get the LLM model
-llm: any = get_llm()
+
+@lru_cache(maxsize=None)
+def get_graph_llm():
+    """LLM shared by the graph nodes, created on first use."""
+    return get_llm()
+
+
+# Local relevance tier that decides clear-cut chunks without the LLM
+pre_grader = TieredPreGrader()
+registry.gauge(
+    "agentrag_pregrader", "Pre-grader tier decisions.", "stat", pre_grader.stats
+)
 
 
+OFF_TOPIC_ANSWER = "I cant respond to that!"
+
+
+def _set_documents(state: AgentState, documents: List[Document]):
+    """Store retrieved chunks with their scores and sources in the state."""
+    state["documents"] = [doc.page_content for doc in documents]
+    state["scores"] = [doc.metadata.get("vector_score") for doc in documents]
+    state["sources"] = [
+        {
+            "document_id": doc.metadata.get("document_id"),
+            "document_name": doc.metadata.get("document_name"),
+            "page": doc.metadata.get("page"),
+            "start_index": doc.metadata.get("start_index"),
+            "score": doc.metadata.get("retrieval_score"),
+        }
+        for doc in documents
+    ]
+
+
+@instrument_node("retrieve_docs")
 def retrieve_docs(state: AgentState, vector_store: VectorStore) -> AgentState:
     """Retrieve documents based on the question."""
     question = state["question"]
-    retriever = vector_store.db.as_retriever()
-    documents = retriever.invoke(input=question)
-    state["documents"] = [doc.page_content for doc in documents]
+    k = settings.RETRIEVAL_K
+    if not can_afford(state, "retrieve_docs", "document_grader", "generate_answer"):
+        # Fewer chunks are quicker to grade and to answer from
+        degrade(state, "retrieved_fewer_chunks")
+        k = min(k, settings.DEADLINE_GRADE_LIMIT)
+    documents = vector_store.search(question, k=k)
+    _set_documents(state, documents)
+    return state
+
+
+class QueryVariants(BaseModel):
+    """Alternative search queries for a question."""
+
+    queries: List[str] = Field(description="Alternative search queries, one per item")
+
+
+def _query_variants(question: str) -> List[str]:
+    """The question followed by up to MULTI_QUERY_COUNT distinct LLM variants."""
+    structured_llm = get_graph_llm().with_structured_output(QueryVariants)
+    generator = scheduled(get_multi_query_prompt() | structured_llm, "rewrite")
+    try:
+        result = generator.invoke(
+            {"question": question, "count": settings.MULTI_QUERY_COUNT}
+        )
+        variants = result.queries[: settings.MULTI_QUERY_COUNT]
+    except Exception as e:
+        # Retrieval still works with the original question alone
+        logger.warning(f"[multi_query_retrieve] Could not generate variants: {e}")
+        variants = []
+    queries, seen = [], set()
+    for query in [question, *variants]:
+        key = normalize_question(query or "")
+        if key and key not in seen:
+            seen.add(key)
+            queries.append(query.strip())
+    return queries
+
+
+@instrument_node("multi_query_retrieve")
+def multi_query_retrieve(state: AgentState, vector_store: VectorStore) -> AgentState:
+    """Retrieve for several query variants in one batch and fuse the results."""
+    if can_afford(state, "multi_query_retrieve", "document_grader", "generate_answer"):
+        queries = _query_variants(state["question"])
+    else:
+        degrade(state, "skipped_query_variants")
+        queries = [state["question"]]
+    results = vector_store.search_many(queries)
+
+    # Deduplicate by chunk ID, keeping the best similarity any variant saw
+    chunks: Dict[str, Document] = {}
+    for documents in results:
+        for doc in documents:
+            best = chunks.get(doc.id)
+            score = doc.metadata.get("vector_score") or -1.0
+            if best is None or score > (best.metadata.get("vector_score") or -1.0):
+                chunks[doc.id] = doc
+
+    rankings = {
+        query: [doc.id for doc in documents]
+        for query, documents in zip(queries, results)
+    }
+    fused = reciprocal_rank_fusion(rankings, weights={}, k=settings.RRF_K)
+    fused = fused[: settings.MULTI_QUERY_TOP_K]
+    documents = []
+    for chunk_id, score in fused:
+        doc = chunks[chunk_id]
+        doc.metadata = {**doc.metadata, "retrieval_score": score}
+        documents.append(doc)
+    _set_documents(state, documents)
+    state["queries"] = queries
     return state
 
 
@@ -34,24 +175,121 @@ class GradeDocuments(BaseModel):
     )
 
 
-def document_grader(state: AgentState) -> AgentState:
-    """Grade the retrieved documents."""
-    docs = state["documents"]
-    question = state["question"]
+class BatchGradeDocuments(BaseModel):
+    """Relevance scores for several retrieved documents, in input order."""
+
+    scores: List[Literal["Yes", "No"]] = Field(
+        description="One 'Yes' or 'No' per document, in the order they were given"
+    )
 
-    grade_prompt = get_grade_prompt()
 
-    # Use the LLM model with a structured output
-    structured_llm = llm.with_structured_output(GradeDocuments)
-    grader_llm = grade_prompt | structured_llm
+def _grade_sequential(docs: List[str], question: str) -> List[str]:
+    """Grade each document with its own LLM call, one after another."""
+    structured_llm = get_graph_llm().with_structured_output(GradeDocuments)
+    grader_llm = scheduled(get_grade_prompt() | structured_llm, "grade")
     scores = []
     for doc in docs:
         result = grader_llm.invoke({"document": doc, "question": question})
         scores.append(result.score)
-    state["grades"] = scores
+    return scores
+
+
+def _grade_concurrent(docs: List[str], question: str) -> List[str]:
+    """Grade all documents at once through the batch API with a bounded pool."""
+    structured_llm = get_graph_llm().with_structured_output(GradeDocuments)
+    grader_llm = scheduled(get_grade_prompt() | structured_llm, "grade")
+    results = grader_llm.batch(
+        [{"document": doc, "question": question} for doc in docs],
+        config={"max_concurrency": settings.GRADING_CONCURRENCY},
+    )
+    return [result.score for result in results]
+
+
+def _grade_single_call(docs: List[str], question: str) -> List[str]:
+    """Grade all documents in one structured-output request."""
+    structured_llm = get_graph_llm().with_structured_output(BatchGradeDocuments)
+    grader_llm = scheduled(get_batch_grade_prompt() | structured_llm, "grade")
+    numbered = "\n\n".join(f"[{i}] {doc}" for i, doc in enumerate(docs, start=1))
+    result = grader_llm.invoke(
+        {"documents": numbered, "question": question, "count": len(docs)}
+    )
+    scores = list(result.scores)
+    if len(scores) != len(docs):
+        logger.warning(
+            f"[document_grader] Expected {len(docs)} grades, got {len(scores)}"
+        )
+        # Missing grades count as irrelevant, extra ones are dropped
+        scores = (scores + ["No"] * len(docs))[: len(docs)]
+    return scores
+
+
+GRADERS = {
+    "sequential": _grade_sequential,
+    "concurrent": _grade_concurrent,
+    "single_call": _grade_single_call,
+}
+
+
+def _grading_seconds(chunks: int) -> float:
+    """Expected time to LLM-grade ``chunks`` chunks in the configured mode."""
+    if settings.GRADING_MODE == "sequential":
+        calls = chunks
+    elif settings.GRADING_MODE == "concurrent":
+        calls = math.ceil(chunks / max(1, settings.GRADING_CONCURRENCY))
+    else:
+        calls = 1
+    return calls * expected_call_seconds("grade")
+
+
+@instrument_node("document_grader")
+def document_grader(state: AgentState) -> AgentState:
+    """Grade the retrieved documents."""
+    docs = state["documents"]
+    question = state["question"]
+
+    if not docs:
+        state["grades"] = []
+        return state
+
+    grader = GRADERS.get(settings.GRADING_MODE)
+    if grader is None:
+        raise ValueError(f"Unknown grading mode: {settings.GRADING_MODE}")
+
+    grades = [None] * len(docs)
+    if settings.PREGRADE_ENABLED:
+        scores = state.get("scores") or [None] * len(docs)
+        grades = pre_grader.grade(question, docs, scores)
+
+    # Only the chunks the local tier could not decide go to the LLM
+    pending = [i for i, grade in enumerate(grades) if grade is None]
+    left = remaining(state) - expected_seconds("generate_answer")
+    if pending and _grading_seconds(len(pending)) > left:
+        if _grading_seconds(min(len(pending), settings.DEADLINE_GRADE_LIMIT)) <= left:
+            # Grade only the best-ranked chunks; the rest count as irrelevant
+            degrade(state, "graded_fewer_chunks")
+            for i in pending[settings.DEADLINE_GRADE_LIMIT :]:
+                grades[i] = "No"
+            pending = pending[: settings.DEADLINE_GRADE_LIMIT]
+        else:
+            # No time to grade: trust the retrieval ranking and go answer
+            degrade(state, "skipped_grading")
+            for i in pending:
+                grades[i] = "Yes"
+            pending = []
+    if pending:
+        try:
+            llm_grades = grader([docs[i] for i in pending], question)
+        except DeadlineExceeded:
+            # The scheduler could not fit the calls in; answer from the ranking
+            degrade(state, "skipped_grading")
+            llm_grades = ["Yes"] * len(pending)
+        for i, grade in zip(pending, llm_grades):
+            grades[i] = grade
+    state["grades"] = grades
     return state
 
 
+@instrument_node("rewrite_query")
 def rewriter(state: AgentState) -> AgentState:
     """Rewrite the question."""
     question = state["question"]
@@ -59,31 +297,89 @@ def rewriter(state: AgentState) -> AgentState:
     re_write_prompt = get_rewrite_prompt()
 
     # Use the LLM model with a string output parser
-    question_rewriter = re_write_prompt | llm | StrOutputParser()
-    output = question_rewriter.invoke({"question": question})
+    question_rewriter = scheduled(
+        re_write_prompt | _llm_within_deadline(state) | StrOutputParser(), "rewrite"
+    )
+    try:
+        output = question_rewriter.invoke({"question": question})
+    except DeadlineExceeded:
+        # Out of time: searching again for the same question would only
+        # regrade the same chunks, so rewrite_router answers off-topic
+        degrade(state, "skipped_rewrite")
+        state["rewrite_skipped"] = True
+        return state
     state["question"] = output
     state["loop_count"] += 1
     return state
 
 
+def _llm_within_deadline(state: AgentState):
+    """The graph LLM, with its call timeout capped at the time left."""
+    if state.get("deadline") is None:
+        return get_graph_llm()
+    return get_graph_llm().bind(timeout=llm_timeout(state))
+
+
+@instrument_node("generate_answer")
 def generate_answer(state: AgentState) -> AgentState:
     """Generate an answer based on the question and context."""
     question = state["question"]
     context = state["documents"]
+    if settings.CONTEXT_PACKING_ENABLED:
+        context, stats = pack_context(
+            context, state.get("grades"), state.get("sources")
+        )
+        CONTEXT_TOKENS.inc(stats["raw_tokens"], kind="raw")
+        CONTEXT_TOKENS.inc(stats["packed_tokens"], kind="packed")
+        timings = request_timings.get()
+        if timings is not None:
+            timings["context"] = stats
+        logger.info(
+            f"[generate_answer] Packed {stats['chunks']} chunks into "
+            f"{stats['blocks']} blocks, saved ~{stats['tokens_saved']} tokens"
+        )
 
     prompt = get_answer_prompt()
-    chain = prompt | llm | StrOutputParser()
+    chain = scheduled(prompt | _llm_within_deadline(state) | StrOutputParser(), "answer")
     result = chain.invoke({"question": question, "context": context})
     state["llm_output"] = result
     return state
 
 
+@instrument_node("off_topic_response")
 def off_topic_response(state: AgentState) -> AgentState:
     """Handle an off-topic response."""
-    state["llm_output"] = "I cant respond to that!"
+    if _rewrite_skipped(state):
+        degrade(state, "skipped_rewrite")
+    state["llm_output"] = OFF_TOPIC_ANSWER
     return state
 
 
+def retrieval_router(state: AgentState) -> str:
+    """Pick the retrieval strategy of the request."""
+    mode = state.get("retrieval_mode") or settings.RETRIEVAL_MODE
+    return "multi_query_retrieve" if mode == "fusion" else "retrieve_docs"
+
+
+def _rewrite_skipped(state: AgentState) -> bool:
+    """Whether a rewrite round is due but would not finish before the deadline."""
+    return (
+        state.get("retrieval_mode") != "fusion"
+        and state["loop_count"] <= 1
+        and not any(grade.lower() == "yes" for grade in state.get("grades") or [])
+        and not can_afford(
+            state, "rewrite_query", "retrieve_docs", "document_grader", "generate_answer"
+        )
+    )
+
+
+def rewrite_router(state: AgentState) -> str:
+    """Search again with the rewritten question, unless the rewrite was skipped."""
+    if state.get("rewrite_skipped"):
+        return "off_topic_response"
+    return "retrieve_docs"
+
+
 def gen_router(state: AgentState) -> str:
     """Determine the next step in the workflow."""
     grades = state["grades"]
@@ -91,9 +387,13 @@ def gen_router(state: AgentState) -> str:
 
     if any(grade.lower() == "yes" for grade in grades):
         return "generate"
+    elif state.get("retrieval_mode") == "fusion":  # Fusion grades a single round
+        return "off_topic_response"
     elif loop_count > 1:  # Switch to general AI after 2 rewrite
         print("GOING to OFF TOPIC")
         return "off_topic_response"
+    elif _rewrite_skipped(state):  # Another round would miss the deadline
+        return "off_topic_response"
     else:
         return "rewrite_query"
 
@@ -101,11 +401,85 @@ def gen_router(state: AgentState) -> str:
 # Create a state graph
 workflow = StateGraph(AgentState)
 
-# Create a vector store
-vector_store = VectorStore()
+# Collections are resolved on first use, so importing this module does not
+# load the embedding model
+
+# One answer cache per collection and retrieval mode, each dropped when its
+# collection is re-indexed, so answers never leak between collections and
+# each mode answers with its own graph run
+_answer_caches: "OrderedDict[Tuple[str, str], SemanticAnswerCache]" = OrderedDict()
+_answer_caches_lock = threading.Lock()
+
+
+def get_answer_cache(
+    collection: str = DEFAULT_COLLECTION, retrieval_mode: Optional[str] = None
+) -> SemanticAnswerCache:
+    """The answer cache of a collection and retrieval mode, keeping the most
+    recently used ones."""
+    key = (collection, retrieval_mode or settings.RETRIEVAL_MODE)
+    with _answer_caches_lock:
+        cache = _answer_caches.get(key)
+        if cache is None:
+            cache = SemanticAnswerCache(
+                embed_query=lambda question: shared_query_embedder().embed_query(question),
+                index_version=lambda: get_vector_store(collection).index_version,
+            )
+            _answer_caches[key] = cache
+        _answer_caches.move_to_end(key)
+        # Room for both retrieval modes of every open collection
+        while len(_answer_caches) > 2 * settings.MAX_OPEN_COLLECTIONS:
+            _answer_caches.popitem(last=False)
+        return cache
+
+
+def answer_cache_stats() -> Dict[str, float]:
+    """Answer cache counters summed over collections and retrieval modes."""
+    with _answer_caches_lock:
+        caches = list(_answer_caches.values())
+        collections = {collection for collection, _ in _answer_caches}
+    totals = dict.fromkeys(
+        ["exact_hits", "semantic_hits", "misses", "invalidations", "size"], 0
+    )
+    for cache in caches:
+        stats = cache.stats()
+        for key in totals:
+            totals[key] += stats[key]
+    hits = totals["exact_hits"] + totals["semantic_hits"]
+    total = hits + totals["misses"]
+    return {
+        **totals,
+        "hit_rate": hits / total if total else 0.0,
+        "collections": len(collections),
+        "max_entries": settings.ANSWER_CACHE_MAX_ENTRIES,
+    }
+
+
+registry.gauge(
+    "agentrag_answer_cache",
+    "Semantic answer cache statistics.",
+    "stat",
+    answer_cache_stats,
+)
+
+# Identical questions asked concurrently share one graph execution
+inflight = SingleFlight()
+registry.gauge(
+    "agentrag_singleflight", "Coalesced question executions.", "stat", inflight.stats
+)
 
 # Add nodes to the workflow
-workflow.add_node("retrieve_docs", lambda state: retrieve_docs(state, vector_store))
+workflow.add_node(
+    "retrieve_docs",
+    lambda state: retrieve_docs(
+        state, get_vector_store(state.get("collection") or DEFAULT_COLLECTION)
+    ),
+)
+workflow.add_node(
+    "multi_query_retrieve",
+    lambda state: multi_query_retrieve(
+        state, get_vector_store(state.get("collection") or DEFAULT_COLLECTION)
+    ),
+)
 workflow.add_node("document_grader", document_grader)
 workflow.add_node("rewrite_query", rewriter)
 workflow.add_node("generate_answer", generate_answer)
@@ -113,6 +487,7 @@ workflow.add_node("off_topic_response", off_topic_response)
 
 # Add edges to the workflow
 workflow.add_edge("retrieve_docs", "document_grader")
+workflow.add_edge("multi_query_retrieve", "document_grader")
 
 # Add conditional edges to the workflow
 workflow.add_conditional_edges(
@@ -124,21 +499,266 @@ workflow.add_conditional_edges(
         "off_topic_response": "off_topic_response",
     },
 )
-workflow.add_edge("rewrite_query", "retrieve_docs")
+workflow.add_conditional_edges(
+    "rewrite_query",
+    rewrite_router,
+    {
+        "retrieve_docs": "retrieve_docs",
+        "off_topic_response": "off_topic_response",
+    },
+)
 workflow.add_edge("generate_answer", END)
 workflow.add_edge("off_topic_response", END)
 
 # Set the entry point of the workflow
-workflow.set_entry_point("retrieve_docs")
+workflow.set_conditional_entry_point(
+    retrieval_router,
+    {
+        "retrieve_docs": "retrieve_docs",
+        "multi_query_retrieve": "multi_query_retrieve",
+    },
+)
 
 # Compile the workflow
 graph = workflow.compile()
 
 
-async def generate_response(questions):
-    """Generate responses for multiple questions using the workflow."""
-    result = []
-    for question in questions:
-        output = await graph.ainvoke({"question": question, "loop_count": 0})
-        result.append({"question": question, "answer": output["llm_output"]})
-    return result
+def _record_outcome(output: AgentState):
+    """Count how a question was resolved by the workflow."""
+    REWRITE_LOOPS.observe(output.get("loop_count", 0))
+    grades = output.get("grades") or []
+    if any(grade.lower() == "yes" for grade in grades):
+        QUESTIONS.inc(outcome="answered")
+    else:
+        QUESTIONS.inc(outcome="off_topic")
+
+
+def _check_deadline(result: dict, deadline: float):
+    """Flag and count an answer that arrived after its deadline."""
+    if remaining({"deadline": deadline}) < 0:
+        result["deadline_missed"] = True
+        DEADLINES_MISSED.inc()
+
+
+def _initial_state(
+    question: str, collection: str, retrieval_mode: str, deadline=None
+) -> dict:
+    return {
+        "question": question,
+        "collection": collection,
+        "retrieval_mode": retrieval_mode,
+        "loop_count": 0,
+        "rewrite_skipped": False,
+        "deadline": deadline,
+        "degradations": [],
+    }
+
+
+async def run_graph(
+    question: str, collection: str, version: int, retrieval_mode: str, deadline=None
+):
+    """Run the graph for a question, sharing a run already in progress.
+
+    Runs are keyed by collection, normalized question, index version and
+    retrieval mode, so a question is never answered from a different version
+    of the index. Questions with a deadline run on their own, since a shared
+    run follows the leader's deadline. Returns the final state and whether it
+    came from another caller's run.
+    """
+
+    def invoke():
+        return graph.ainvoke(
+            _initial_state(question, collection, retrieval_mode, deadline)
+        )
+
+    if not settings.COALESCE_ENABLED or deadline is not None:
+        return await invoke(), False
+    key = (collection, normalize_question(question), version, retrieval_mode)
+    return await inflight.do(key, invoke)
+
+
+async def generate_response(
+    questions,
+    max_concurrency=settings.ASK_CONCURRENCY,
+    use_cache=True,
+    include_timings=False,
+    collection=DEFAULT_COLLECTION,
+    retrieval_mode=None,
+    deadline=None,
+):
+    """Generate responses for multiple questions using the workflow.
+
+    Questions are run concurrently, at most ``max_concurrency`` at a time, and
+    results are returned in input order. A failing question yields an entry
+    with an ``error`` field instead of failing the whole batch. Answers are
+    served from the semantic answer cache unless ``use_cache`` is False. With
+    ``include_timings``, each entry carries a per-node timing breakdown.
+    Questions are answered from ``collection`` using ``retrieval_mode``
+    (``rewrite`` or ``fusion``, RETRIEVAL_MODE by default). Identical questions in
+    flight at the same time, in this batch or in concurrent calls, share one
+    graph execution. With a ``deadline`` (a ``time.monotonic()`` value) the
+    graph skips work it has no time for and each entry lists the
+    ``degradations`` applied; degraded answers are not cached.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    use_cache = use_cache and settings.ANSWER_CACHE_ENABLED
+    retrieval_mode = retrieval_mode or settings.RETRIEVAL_MODE
+    answer_cache = get_answer_cache(collection, retrieval_mode)
+
+    async def answer(question):
+        async with semaphore:
+            # Each question runs in its own task, so the breakdown is per question
+            timings = {"nodes": []}
+            request_timings.set(timings)
+            request_deadline.set(deadline)
+            start = time.perf_counter()
+            result = {"question": question}
+            try:
+                cached = None
+                if use_cache:
+                    cached = await asyncio.to_thread(answer_cache.get, question)
+                if cached is not None:
+                    QUESTIONS.inc(outcome="cached")
+                    result["answer"] = cached
+                    timings["cached"] = True
+                else:
+                    version = get_vector_store(collection).index_version
+                    output, shared = await run_graph(
+                        question, collection, version, retrieval_mode, deadline
+                    )
+                    degradations = output.get("degradations") or []
+                    if shared:
+                        QUESTIONS.inc(outcome="coalesced")
+                        timings["coalesced"] = True
+                    else:
+                        _record_outcome(output)
+                        if use_cache and not degradations:
+                            await asyncio.to_thread(
+                                answer_cache.put,
+                                question,
+                                output["llm_output"],
+                                version,
+                            )
+                    result["answer"] = output["llm_output"]
+                    timings["rewrite_loops"] = output.get("loop_count", 0)
+                    if deadline is not None:
+                        result["degradations"] = degradations
+                        _check_deadline(result, deadline)
+            except Exception as e:
+                logger.error(f"[generate_response] Failed to answer question: {e}")
+                QUESTIONS.inc(outcome="error")
+                result.update({"answer": "", "error": str(e)})
+                if deadline is not None:
+                    _check_deadline(result, deadline)
+            if include_timings:
+                timings["total_seconds"] = round(time.perf_counter() - start, 4)
+                result["timings"] = timings
+            return result
+
+    return await asyncio.gather(*(answer(question) for question in questions))
+
+
+# Progress event emitted when each node finishes
+NODE_EVENTS = {
+    "retrieve_docs": "retrieved",
+    "multi_query_retrieve": "retrieved",
+    "document_grader": "graded",
+    "rewrite_query": "rewritten",
+    "generate_answer": "generated",
+    "off_topic_response": "off_topic",
+}
+
+
+def _progress_detail(node: str, state: AgentState) -> dict:
+    """Small summary of a node's output for progress events."""
+    if node == "retrieve_docs":
+        return {"documents": len(state.get("documents") or [])}
+    if node == "multi_query_retrieve":
+        return {
+            "documents": len(state.get("documents") or []),
+            "queries": state.get("queries") or [],
+        }
+    if node == "document_grader":
+        return {"grades": state.get("grades") or []}
+    if node == "rewrite_query":
+        return {"question": state.get("question")}
+    return {}
+
+
+async def stream_response(
+    questions,
+    use_cache=True,
+    collection=DEFAULT_COLLECTION,
+    retrieval_mode=None,
+    deadline=None,
+):
+    """Stream node progress and answer tokens for each question, one at a time.
+
+    Yields ``(event, data)`` pairs: ``question`` when a question starts,
+    ``progress`` as each node finishes, ``token`` for every answer token,
+    ``answer`` with the complete answer, ``error`` if a question fails and
+    ``done`` at the end. With a ``deadline`` for the whole stream, answers
+    list the ``degradations`` applied.
+    """
+    use_cache = use_cache and settings.ANSWER_CACHE_ENABLED
+    retrieval_mode = retrieval_mode or settings.RETRIEVAL_MODE
+    answer_cache = get_answer_cache(collection, retrieval_mode)
+    request_deadline.set(deadline)
+
+    for index, question in enumerate(questions):
+        yield "question", {"index": index, "question": question}
+        try:
+            if use_cache:
+                cached = await asyncio.to_thread(answer_cache.get, question)
+                if cached is not None:
+                    QUESTIONS.inc(outcome="cached")
+                    yield "progress", {"index": index, "node": "cached"}
+                    yield "token", {"index": index, "token": cached}
+                    yield "answer", {
+                        "index": index,
+                        "question": question,
+                        "answer": cached,
+                    }
+                    continue
+
+            version = get_vector_store(collection).index_version
+            answer, final_state = "", {}
+            async for mode, chunk in graph.astream(
+                _initial_state(question, collection, retrieval_mode, deadline),
+                stream_mode=["updates", "messages"],
+            ):
+                if mode == "messages":
+                    message, metadata = chunk
+                    # Only the answer chain's tokens are streamed, not the grader's
+                    node = metadata.get("langgraph_node")
+                    if node == "generate_answer" and message.content:
+                        yield "token", {"index": index, "token": message.content}
+                    continue
+                for node, update in chunk.items():
+                    if node not in NODE_EVENTS:
+                        continue
+                    yield "progress", {
+                        "index": index,
+                        "node": NODE_EVENTS[node],
+                        **_progress_detail(node, update),
+                    }
+                    if node in ("generate_answer", "off_topic_response"):
+                        answer, final_state = update["llm_output"], update
+            _record_outcome(final_state)
+            result = {"index": index, "question": question, "answer": answer}
+            degradations = final_state.get("degradations") or []
+            if use_cache and not degradations:
+                await asyncio.to_thread(answer_cache.put, question, answer, version)
+            if deadline is not None:
+                result["degradations"] = degradations
+                _check_deadline(result, deadline)
+            yield "answer", result
+        except Exception as e:
+            logger.error(f"[stream_response] Failed to answer question: {e}")
+            QUESTIONS.inc(outcome="error")
+            error = {"index": index, "question": question, "error": str(e)}
+            if deadline is not None:
+                _check_deadline(error, deadline)
+            yield "error", error
+
+    yield "done", {}
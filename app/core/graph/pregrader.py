@@ -0,0 +1,88 @@
+import threading
+from typing import Dict, List, Optional
+
+from app.config.settings import Settings
+
+settings = Settings()
+
+
+class TieredPreGrader:
+    """Local relevance tier in front of the LLM grader.
+
+    Each chunk gets a local score, either its retrieval similarity or, when a
+    cross-encoder model is configured, the cross-encoder probability. Chunks
+    scoring at or above ``accept`` are graded "Yes", at or below ``reject``
+    "No", and the ones in between are left (``None``) for the LLM grader.
+    """
+
+    def __init__(
+        self,
+        cross_encoder_model: Optional[str] = settings.PREGRADE_CROSS_ENCODER,
+        accept: Optional[float] = None,
+        reject: Optional[float] = None,
+    ):
+        self.cross_encoder_model = cross_encoder_model
+        if cross_encoder_model:
+            default_accept, default_reject = settings.PREGRADE_CROSS_ENCODER_THRESHOLDS
+        else:
+            default_accept, default_reject = settings.PREGRADE_SIMILARITY_THRESHOLDS
+        self.accept = default_accept if accept is None else accept
+        self.reject = default_reject if reject is None else reject
+        self._cross_encoder = None
+        self._lock = threading.Lock()
+        self.counters = {"local_yes": 0, "local_no": 0, "escalated": 0}
+
+    def _get_cross_encoder(self):
+        """Load the cross-encoder on first use."""
+        with self._lock:
+            if self._cross_encoder is None:
+                from sentence_transformers import CrossEncoder
+
+                self._cross_encoder = CrossEncoder(
+                    self.cross_encoder_model, device="cpu"
+                )
+            return self._cross_encoder
+
+    def local_scores(
+        self, question: str, docs: List[str], similarities: List[Optional[float]]
+    ) -> List[Optional[float]]:
+        """Score each chunk locally in [0, 1]; None when no score is available."""
+        if not self.cross_encoder_model:
+            return list(similarities)
+        import torch
+
+        # Sigmoid of the logits, whatever activation the model config names
+        scores = self._get_cross_encoder().predict(
+            [(question, doc) for doc in docs], activation_fn=torch.nn.Sigmoid()
+        )
+        return [float(score) for score in scores]
+
+    def grade(
+        self, question: str, docs: List[str], similarities: List[Optional[float]]
+    ) -> List[Optional[str]]:
+        """Return "Yes"/"No" for chunks decided locally and None for the rest."""
+        grades = []
+        for score in self.local_scores(question, docs, similarities):
+            if score is not None and score >= self.accept:
+                grade = "Yes"
+            elif score is not None and score <= self.reject:
+                grade = "No"
+            else:
+                grade = None
+            grades.append(grade)
+
+        with self._lock:
+            self.counters["local_yes"] += grades.count("Yes")
+            self.counters["local_no"] += grades.count("No")
+            self.counters["escalated"] += grades.count(None)
+        return grades
+
+    def stats(self) -> Dict[str, float]:
+        """Return how often each tier decided."""
+        with self._lock:
+            total = sum(self.counters.values())
+            local = self.counters["local_yes"] + self.counters["local_no"]
+            return {
+                **self.counters,
+                "local_rate": local / total if total else 0.0,
+            }
@@ -27,6 +27,32 @@ def get_grade_prompt() -> ChatPromptTemplate:
     )
 
 
+def get_batch_grade_prompt() -> ChatPromptTemplate:
+    """Get the grading prompt template that scores several excerpts in one call."""
+    system = """You are a precision grading system analyzing document-question relevance. For each numbered document excerpt, evaluate whether it:
+    1. Directly addresses the question's core subject matter
+    2. Contains supporting evidence for potential answers
+    3. Shares contextual overlap with key entities/relationships
+    
+    Response Guidelines:
+    - "Yes" only if the excerpt provides substantive, actionable information
+    - "No" for tangential references or incomplete information
+    - Consider semantic relationships, not just keyword matches
+    - Return exactly one 'Yes' or 'No' per excerpt, in the order given, without commentary"""
+
+    return ChatPromptTemplate.from_messages(
+        [
+            ("system", system),
+            (
+                "human",
+                "Document Excerpts:\n{documents}\n\n"
+                "User Query: {question}\n\n"
+                "Relevance Judgments ({count} values, Yes/No):",
+            ),
+        ]
+    )
+
+
 def get_rewrite_prompt() -> ChatPromptTemplate:
     """Get the enhanced query optimization prompt template."""
     system = """You are a search optimization engine. Improve the query by:
@@ -48,6 +74,31 @@ def get_rewrite_prompt() -> ChatPromptTemplate:
     )
 
 
+def get_multi_query_prompt() -> ChatPromptTemplate:
+    """Get the query variant generation prompt template."""
+    system = """You are a search optimization engine. Write alternative search queries for the question:
+    1. Each variant targets the same information need
+    2. Vary wording, synonyms and level of detail
+    3. Expand abbreviations and clarify ambiguous terms
+    4. Keep identifiers such as codes, names and numbers unchanged
+    
+    Output Format:
+    - Exactly the requested number of queries
+    - Each a single natural language query
+    - Preserve original language"""
+
+    return ChatPromptTemplate.from_messages(
+        [
+            ("system", system),
+            (
+                "human",
+                "Original Question:\n{question}\n\n"
+                "Alternative Search Queries ({count}):",
+            ),
+        ]
+    )
+
+
 def get_answer_prompt() -> ChatPromptTemplate:
     """Get the precision answer generation prompt template."""
     system = """Generate authoritative answers using these rules:
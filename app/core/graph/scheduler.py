@@ -0,0 +1,279 @@
+import heapq
+import itertools
+import json
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler, BaseCallbackManager
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+
+from app.config.logging_config import configure_logging
+from app.config.settings import Settings
+from app.core.graph.budget import DeadlineExceeded, request_deadline
+from app.core.metrics import LLM_CALL_DURATION, registry
+
+settings = Settings()
+
+# Lower value = served first when calls are queued for rate-limit capacity
+LANES: Dict[str, int] = {"answer": 0, "rewrite": 1, "grade": 2}
+
+QUEUE_WAIT = registry.histogram(
+    "agentrag_llm_queue_wait_seconds",
+    "Time LLM calls wait for rate-limit capacity.",
+    ["lane"],
+)
+RETRIES = registry.counter(
+    "agentrag_llm_retries_total", "LLM call retries, by reason.", ["reason"]
+)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``per_minute`` units per minute.
+
+    A ``per_minute`` of 0 or less disables the limit.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available (0 if they are now)."""
+        if self.capacity <= 0:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)  # Oversized calls wait for a full bucket
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float):
+        if self.capacity <= 0:
+            return
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def drain(self):
+        """Empty the bucket, e.g. after the provider reported a rate limit."""
+        if self.capacity > 0:
+            self.level = 0.0
+            self.updated = time.monotonic()
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Retry-After header of a provider error, in seconds, if present."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMScheduler:
+    """Process-wide gate for LLM calls.
+
+    Calls wait for capacity in request-per-minute and token-per-minute
+    buckets, served in priority order by lane, so answer generation is not
+    starved by grading. Rate-limit (429) responses pause every lane for a
+    jittered exponential backoff; timeouts, connection errors and 5xx
+    responses are retried with the same backoff.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = settings.LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = settings.LLM_TOKENS_PER_MINUTE,
+        max_retries: int = settings.LLM_MAX_RETRIES,
+        backoff_base: float = settings.LLM_BACKOFF_BASE,
+        backoff_max: float = settings.LLM_BACKOFF_MAX,
+    ):
+        self.logger = configure_logging()
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._condition = threading.Condition()
+        self._waiters: list = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self.queue_depth: Dict[str, int] = {lane: 0 for lane in LANES}
+
+    def acquire(self, lane: str, estimated_tokens: int = 0):
+        """Block until the call may run, respecting lane priority.
+
+        Raises DeadlineExceeded instead of waiting past the request deadline.
+        """
+        ticket = (LANES.get(lane, len(LANES)), next(self._sequence))
+        start = time.monotonic()
+        deadline = request_deadline.get()
+        with self._condition:
+            heapq.heappush(self._waiters, ticket)
+            self.queue_depth[lane] = self.queue_depth.get(lane, 0) + 1
+            try:
+                while True:
+                    left = None if deadline is None else deadline - time.monotonic()
+                    if left is not None and left <= 0:
+                        raise DeadlineExceeded(f"Deadline passed before the {lane} call")
+                    if self._waiters[0] != ticket:
+                        self._condition.wait(left)
+                        continue
+                    wait = max(
+                        self._paused_until - time.monotonic(),
+                        self.requests.wait_time(1),
+                        self.tokens.wait_time(estimated_tokens),
+                    )
+                    if wait <= 0:
+                        self.requests.take(1)
+                        self.tokens.take(estimated_tokens)
+                        return
+                    if left is not None and wait > left:
+                        raise DeadlineExceeded(
+                            f"The {lane} call would wait {wait:.2f}s for LLM capacity, "
+                            "past the deadline"
+                        )
+                    self._condition.wait(wait)
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self.queue_depth[lane] -= 1
+                self._condition.notify_all()
+                QUEUE_WAIT.observe(time.monotonic() - start, lane=lane)
+
+    def _pause(self, seconds: float):
+        """Hold every lane back after a rate-limit response."""
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self.requests.drain()
+            self._condition.notify_all()
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = min(self.backoff_max, self.backoff_base * 2**attempt)
+        delay = random.uniform(delay / 2, delay)  # Jitter avoids synchronized retries
+        return max(delay, _retry_after(error) or 0.0)
+
+    @staticmethod
+    def _retry_reason(error: Exception) -> Optional[str]:
+        status = _status_code(error)
+        if status == 429:
+            return "rate_limit"
+        if status is not None and status >= 500:
+            return "server_error"
+        name = type(error).__name__
+        if isinstance(error, TimeoutError) or "Timeout" in name:
+            return "timeout"
+        if "Connection" in name:
+            return "connection"
+        return None
+
+    def run(
+        self,
+        lane: str,
+        func: Callable[..., Any],
+        *args,
+        estimated_tokens: int = 0,
+        can_retry: Callable[[], bool] = lambda: True,
+        **kwargs,
+    ) -> Any:
+        """Run ``func`` once capacity is available, retrying transient errors.
+
+        Retries stop early when the backoff would outlast the request deadline,
+        or when ``can_retry()`` says the failed attempt cannot be replayed.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.acquire(lane, estimated_tokens)
+            start = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+                LLM_CALL_DURATION.observe(time.monotonic() - start, lane=lane)
+                return result
+            except Exception as e:
+                reason = self._retry_reason(e)
+                if reason is None or attempt == self.max_retries or not can_retry():
+                    raise
+                delay = self._backoff(attempt, e)
+                deadline = request_deadline.get()
+                if deadline is not None and time.monotonic() + delay > deadline:
+                    raise
+                RETRIES.inc(reason=reason)
+                self.logger.warning(
+                    f"[LLMScheduler] {lane} call failed ({reason}), "
+                    f"retrying in {delay:.2f}s"
+                )
+                if reason == "rate_limit":
+                    self._pause(delay)
+                time.sleep(delay)
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return {f"queue_depth_{lane}": depth for lane, depth in self.queue_depth.items()}
+
+
+def estimate_tokens(inputs: Any) -> int:
+    """Rough token estimate of a call: prompt inputs plus fixed overhead."""
+    try:
+        text = json.dumps(inputs, default=str)
+    except (TypeError, ValueError):
+        text = str(inputs)
+    return len(text) // 4 + settings.LLM_TOKEN_OVERHEAD
+
+
+scheduler = LLMScheduler()
+registry.gauge(
+    "agentrag_llm_scheduler", "LLM scheduler queue depth by lane.", "stat", scheduler.stats
+)
+
+
+class _TokenWatch(BaseCallbackHandler):
+    """Notices when a call has streamed a token to the client."""
+
+    def __init__(self):
+        self.streamed = False
+
+    def on_llm_new_token(self, token: str, **kwargs: Any):
+        self.streamed = True
+
+
+def _with_handler(config: RunnableConfig, handler: BaseCallbackHandler) -> RunnableConfig:
+    callbacks = config.get("callbacks")
+    if isinstance(callbacks, BaseCallbackManager):
+        callbacks = callbacks.copy()
+        callbacks.add_handler(handler, inherit=True)
+    else:
+        callbacks = [*(callbacks or []), handler]
+    return {**config, "callbacks": callbacks}
+
+
+def scheduled(runnable: Runnable, lane: str) -> Runnable:
+    """Wrap a chain so every invocation goes through the shared scheduler.
+
+    A call that has already streamed tokens is not retried, since the
+    client would receive the answer twice.
+    """
+
+    def call(inputs: Any, config: RunnableConfig) -> Any:
+        watch = _TokenWatch()
+        return scheduler.run(
+            lane,
+            runnable.invoke,
+            inputs,
+            _with_handler(config, watch),
+            estimated_tokens=estimate_tokens(inputs),
+            can_retry=lambda: not watch.streamed,
+        )
+
+    return RunnableLambda(call, name=f"scheduled_{lane}")
@@ -1,11 +1,19 @@
-from typing import TypedDict
+from typing import Optional, TypedDict
 
 
 class AgentState(TypedDict):
     """Agent state dictionary."""
 
     question: str  # The user's question
+    collection: str  # The collection to search
+    retrieval_mode: str  # "rewrite" loop or multi-query "fusion"
+    queries: list[str]  # Queries retrieved for in fusion mode
     grades: list[str]  # The grades of the retrieved documents
     llm_output: str  # The output of the LLM model
     documents: list[str]  # The retrieved documents
+    scores: list[Optional[float]]  # Retrieval similarity of each document
+    sources: list[dict]  # Document, page and offset of each document
     loop_count: int  # The number of times the loop has been executed
+    rewrite_skipped: bool  # The rewrite gave up at the deadline
+    deadline: Optional[float]  # time.monotonic() to answer by, None for no limit
+    degradations: list[str]  # Work skipped to meet the deadline
@@ -0,0 +1,252 @@
+import json
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from app.config.logging_config import configure_logging
+from app.config.settings import Settings
+from app.core.vector_db import DEFAULT_COLLECTION, VectorStore, get_vector_store
+
+settings = Settings()
+
+_JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class QueueFullError(Exception):
+    """Raised when the ingestion queue cannot accept another job."""
+
+
+class IngestionJob:
+    """A single PDF ingestion job and its progress."""
+
+    def __init__(
+        self,
+        file_path: str,
+        document_name: str,
+        collection: str = DEFAULT_COLLECTION,
+        replace: bool = False,
+    ):
+        self.id = uuid.uuid4().hex
+        self.file_path = file_path
+        self.document_name = document_name
+        self.collection = collection
+        self.replace = replace  # Update a stored document of the same name
+        self.status = "queued"  # queued | running | completed | failed
+        self.progress: Dict[str, int] = {
+            "pages_parsed": 0,
+            "chunks_embedded": 0,
+            "chunks_written": 0,
+        }
+        self.result: Optional[Dict[str, int]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def update(self, stage: str, count: int):
+        """Add ``count`` to the progress counter of ``stage``."""
+        with self._lock:
+            self.progress[stage] = self.progress.get(stage, 0) + count
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IngestionJob":
+        """Rebuild a job from ``to_dict`` output, e.g. one saved by another worker."""
+        job = cls(None, data["document_name"], data["collection"])
+        job.id = data["job_id"]
+        for name in (
+            "status", "progress", "result", "error", "created_at", "started_at", "finished_at"
+        ):
+            setattr(job, name, data[name])
+        return job
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "document_name": self.document_name,
+                "collection": self.collection,
+                "document_id": VectorStore.document_id(self.document_name),
+                "status": self.status,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+
+class IngestionQueue:
+    """Bounded job queue feeding PDF ingestion to a pool of worker threads.
+
+    Job status is also saved under ``jobs_dir``, so any server worker
+    process can report a job accepted by another one.
+    """
+
+    def __init__(
+        self,
+        get_vector_store: Callable[[str], VectorStore] = get_vector_store,
+        workers: int = settings.INGEST_WORKERS,
+        max_queue_size: int = settings.INGEST_QUEUE_SIZE,
+        max_finished_jobs: int = 1000,
+        jobs_dir: str = settings.INGEST_JOBS_DIR,
+        save_interval: float = 0.5,
+    ):
+        self.logger = configure_logging()
+        self.get_vector_store = get_vector_store  # Resolved per job and collection
+        self.workers = max(1, workers)
+        self.max_finished_jobs = max_finished_jobs
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self.jobs_dir = jobs_dir
+        self.save_interval = save_interval  # Progress is saved at most this often
+        self._saved_at: Dict[str, float] = {}
+        os.makedirs(jobs_dir, exist_ok=True)
+
+    def _job_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _save(self, job: IngestionJob, progress_only: bool = False):
+        """Write the job status where other worker processes can read it."""
+        now = time.monotonic()
+        if progress_only and now - self._saved_at.get(job.id, 0) < self.save_interval:
+            return
+        self._saved_at[job.id] = now
+        path = self._job_path(job.id)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(job.to_dict(), f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            self.logger.warning(f"[IngestionQueue] Could not save job {job.id}: {e}")
+
+    def _progress(self, job: IngestionJob) -> Callable[[str, int], None]:
+        def update(stage: str, count: int):
+            job.update(stage, count)
+            self._save(job, progress_only=True)
+
+        return update
+
+    def start(self):
+        """Start the worker threads."""
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker, name=f"ingestion-worker-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        self.logger.info(f"[IngestionQueue] Started {self.workers} ingestion workers")
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """Stop the workers once the jobs already queued have finished."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self.logger.info("[IngestionQueue] Ingestion workers stopped")
+
+    def is_full(self) -> bool:
+        return self._queue.full()
+
+    def depth(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self._queue.qsize()
+
+    def submit(
+        self,
+        file_path: str,
+        document_name: str,
+        collection: str = DEFAULT_COLLECTION,
+        replace: bool = False,
+    ) -> IngestionJob:
+        """Queue a PDF for ingestion. Raises QueueFullError when at capacity."""
+        job = IngestionJob(file_path, document_name, collection, replace)
+        with self._jobs_lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._jobs_lock:
+                del self._jobs[job.id]
+            raise QueueFullError("Ingestion queue is full, retry later.")
+        self._save(job)
+        self.logger.info(
+            f"[IngestionQueue] Queued job {job.id} for '{document_name}' "
+            f"in collection '{collection}'"
+        )
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+        if job is not None or not _JOB_ID_PATTERN.match(job_id):
+            return job
+        try:  # Accepted by another worker process
+            with open(self._job_path(job_id), encoding="utf-8") as f:
+                return IngestionJob.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _forget_old_jobs(self):
+        """Drop the oldest finished jobs beyond the retention bound."""
+        with self._jobs_lock:
+            finished = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job.status in ("completed", "failed")
+            ]
+            forgotten = finished[: max(0, len(finished) - self.max_finished_jobs)]
+            for job_id in forgotten:
+                del self._jobs[job_id]
+                self._saved_at.pop(job_id, None)
+        for job_id in forgotten:
+            try:
+                os.unlink(self._job_path(job_id))
+            except FileNotFoundError:
+                pass
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            try:
+                self._run(job)
+            finally:
+                self._queue.task_done()
+                self._forget_old_jobs()
+
+    def _run(self, job: IngestionJob):
+        job.status = "running"
+        job.started_at = time.time()
+        self._save(job)
+        self.logger.info(f"[IngestionQueue] Running job {job.id}")
+        try:
+            job.result = self.get_vector_store(job.collection).index_pdf(
+                job.file_path,
+                document_name=job.document_name,
+                progress=self._progress(job),
+                replace=job.replace,
+            )
+            job.status = "completed"
+            self.logger.info(f"[IngestionQueue] Job {job.id} completed: {job.result}")
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+            self.logger.error(f"[IngestionQueue] Job {job.id} failed: {e}")
+        finally:
+            job.finished_at = time.time()
+            self._save(job)
+            if os.path.exists(job.file_path):
+                os.unlink(job.file_path)
@@ -0,0 +1,316 @@
+import json
+import math
+import os
+import re
+import threading
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config.settings import Settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: savers are only serialized within a process
+    fcntl = None
+
+settings = Settings()
+
+# The snapshot is rewritten once its log outgrows it, but not for tiny logs
+_COMPACT_MIN_BYTES = 1024 * 1024
+
+# Keep part numbers, error codes and versions such as "ERR-404" or "v2.1" whole
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[\-_./][a-z0-9]+)*")
+
+
+_SEPARATOR_PATTERN = re.compile(r"[\-_./]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens for keyword search.
+
+    Compound tokens are kept whole and also split into their parts, so
+    "ERR-404" matches queries for "ERR-404", "err 404" and "404".
+    """
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        parts = _SEPARATOR_PATTERN.split(token)
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+class KeywordIndex:
+    """In-process BM25 inverted index over chunk IDs, persisted as JSON.
+
+    The JSON snapshot names a log of changes saved after it. ``save``
+    appends the changes made since the last save to the log and rewrites
+    the snapshot only once the log outgrows it, so a save costs in
+    proportion to the change. ``refresh`` replays changes saved by other
+    processes.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.KEYWORD_INDEX_PATH,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._terms: Dict[str, List[str]] = {}  # Forward index, for removals
+        self._total_length = 0
+        self._lock = threading.Lock()
+        self._pending: List[dict] = []  # Changes made since the last save
+        self._reset = False  # Cleared: the next save rewrites the snapshot
+        self._stamp: Optional[Tuple[int, int, int]] = None  # Snapshot last read or written
+        self._log_name: Optional[str] = None
+        self._log_offset = 0  # Bytes of the log already applied
+        if os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, chunks: Iterable[Tuple[str, str]]):
+        """Index (chunk ID, text) pairs, replacing chunks already present."""
+        change = {
+            "add": {chunk_id: dict(Counter(tokenize(text))) for chunk_id, text in chunks}
+        }
+        if change["add"]:
+            with self._lock:
+                self._apply(change)
+                self._pending.append(change)
+
+    def remove(self, chunk_ids: Iterable[str]):
+        """Drop chunks from the index."""
+        change = {"remove": list(chunk_ids)}
+        if change["remove"]:
+            with self._lock:
+                self._apply(change)
+                self._pending.append(change)
+
+    def _apply(self, change: dict):
+        for chunk_id in change.get("remove", ()):
+            self._remove(chunk_id)
+        for chunk_id, terms in change.get("add", {}).items():
+            self._remove(chunk_id)
+            for term, count in terms.items():
+                self._postings.setdefault(term, {})[chunk_id] = count
+            length = sum(terms.values())
+            self._terms[chunk_id] = list(terms)
+            self._lengths[chunk_id] = length
+            self._total_length += length
+
+    def _remove(self, chunk_id: str):
+        length = self._lengths.pop(chunk_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in self._terms.pop(chunk_id, []):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(chunk_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def search(self, query: str, k: int = 4) -> List[Tuple[str, float]]:
+        """Return up to ``k`` (chunk ID, BM25 score) pairs, best first."""
+        with self._lock:
+            count = len(self._lengths)
+            if not count:
+                return []
+            average_length = self._total_length / count
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, tf in postings.items():
+                    norm = self.k1 * (
+                        1 - self.b + self.b * self._lengths[chunk_id] / average_length
+                    )
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (
+                        self.k1 + 1
+                    ) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def stats(self) -> Dict[str, int]:
+        """Size of the in-memory index."""
+        with self._lock:
+            return {
+                "chunks": len(self._lengths),
+                "terms": len(self._postings),
+                "postings": sum(len(postings) for postings in self._postings.values()),
+            }
+
+    def _snapshot_stamp(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _log_path(self, name: str) -> str:
+        return os.path.join(os.path.dirname(os.path.abspath(self.path)), name)
+
+    def _read_log(self, name: Optional[str], offset: int) -> Tuple[List[dict], int]:
+        """Complete changes logged after ``offset``, and the offset past them."""
+        if name is None:
+            return [], offset
+        try:
+            with open(self._log_path(name), "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:  # Nothing logged yet
+            return [], offset
+        end = data.rfind(b"\n") + 1  # A line still being written is read next time
+        changes = [json.loads(line) for line in data[:end].splitlines() if line]
+        return changes, offset + end
+
+    @contextmanager
+    def _saving(self):
+        """Serialize savers of this index, across threads and processes."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, open(f"{self.path}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def save(self):
+        """Persist the changes made since the last save."""
+        with self._saving():
+            if not self._reset:
+                self._refresh()  # Log position is now the end of the log
+            if self._reset or self._stamp is None or self._log_name is None:
+                self._compact()
+                return
+            if not self._pending:
+                return
+            data = "".join(json.dumps(change) + "\n" for change in self._pending)
+            data = data.encode("utf-8")
+            fd = os.open(self._log_path(self._log_name), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                os.ftruncate(fd, self._log_offset)  # Drop a line torn by a crash
+                os.lseek(fd, self._log_offset, os.SEEK_SET)
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+            self._log_offset += len(data)
+            self._pending = []
+            if self._log_offset > max(self._stamp[2], _COMPACT_MIN_BYTES):
+                self._compact()
+
+    def _compact(self):
+        """Write the whole index as a new snapshot with an empty log."""
+        old_log = self._log_name
+        log_name = f"{os.path.basename(self.path)}.{uuid.uuid4().hex[:12]}.log"
+        data = {"postings": self._postings, "lengths": self._lengths, "log": log_name}
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temp_path, self.path)
+        self._stamp = self._snapshot_stamp()
+        self._log_name = log_name
+        self._log_offset = 0
+        self._pending = []
+        self._reset = False
+        if old_log is not None:
+            try:
+                os.unlink(self._log_path(old_log))
+            except FileNotFoundError:
+                pass
+
+    def load(self):
+        """Read the snapshot and its log, keeping changes not saved yet."""
+        with self._lock:
+            self._load()
+
+    def _load(self):
+        while True:
+            stamp = self._snapshot_stamp()
+            if stamp is None:
+                return
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except FileNotFoundError:  # Replaced between the two reads
+                continue
+            changes, offset = self._read_log(data.get("log"), 0)
+            if self._snapshot_stamp() == stamp:  # Not compacted meanwhile
+                break
+        self._postings = data["postings"]
+        self._lengths = data["lengths"]
+        self._total_length = sum(self._lengths.values())
+        self._terms = {}
+        for term, postings in self._postings.items():
+            for chunk_id in postings:
+                self._terms.setdefault(chunk_id, []).append(term)
+        for change in changes + self._pending:
+            self._apply(change)
+        self._stamp = stamp
+        self._log_name = data.get("log")
+        self._log_offset = offset
+
+    def stamp(self) -> Optional[tuple]:
+        """Identity of the saved index; changes on every save by any process."""
+        snapshot = self._snapshot_stamp()
+        if snapshot is None:
+            return None
+        try:
+            log = os.stat(self._log_path(self._log_name)).st_size if self._log_name else 0
+        except FileNotFoundError:
+            log = 0
+        return snapshot, log
+
+    def refresh(self) -> bool:
+        """Apply changes saved by other processes. Returns whether there were any."""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> bool:
+        if self._reset:
+            return False
+        stamp = self._snapshot_stamp()
+        if stamp is None:
+            return False
+        if stamp != self._stamp:
+            self._load()
+            return True
+        changes, self._log_offset = self._read_log(self._log_name, self._log_offset)
+        for change in changes:
+            self._apply(change)
+        return bool(changes)
+
+    def clear(self):
+        with self._lock:
+            self._postings = {}
+            self._lengths = {}
+            self._terms = {}
+            self._total_length = 0
+            self._pending = []
+            self._reset = True
+
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, List[str]], weights: Dict[str, float], k: int = 60
+) -> List[Tuple[str, float]]:
+    """Fuse ranked ID lists with weighted reciprocal rank fusion, best first."""
+    scores: Dict[str, float] = {}
+    for name, ranking in rankings.items():
+        weight = weights.get(name, 1.0)
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
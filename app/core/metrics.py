@@ -0,0 +1,271 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Node currently executing, used to attribute LLM calls to graph nodes
+current_node: ContextVar[Optional[str]] = ContextVar("current_node", default=None)
+# Per-request timing breakdown, set by callers that want one
+request_timings: ContextVar[Optional[dict]] = ContextVar("request_timings", default=None)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}  # bucket counts, sum, count
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            series = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def mean(self, **labels) -> Optional[float]:
+        """Mean observed value of a series, or None before the first observation."""
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            series = self._values.get(key)
+            return series[-2] / series[-1] if series else None
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            for key, series in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, series):
+                    labels = _format_labels(self.labels, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.labels, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+                labels = _format_labels(self.labels, key)
+                lines.append(f"{self.name}_sum{labels} {series[-2]}")
+                lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class Gauge:
+    """Gauge whose labelled values are read from a callback at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label: str,
+        collect: Callable[[], Dict[str, float]],
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        for value_name, value in sorted(self.collect().items()):
+            if isinstance(value, (int, float)):
+                lines.append(f'{self.name}{{{self.label}="{value_name}"}} {value}')
+        return lines
+
+
+class Registry:
+    """Process-wide collection of metrics rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        label: str,
+        collect: Callable[[], Dict[str, float]],
+    ) -> Gauge:
+        with self._lock:
+            # Collectors are replaced, so a re-created object reports its own stats
+            self._metrics[name] = Gauge(name, documentation, label, collect)
+            return self._metrics[name]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception:  # A failing collector must not break the scrape
+                continue
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+NODE_DURATION = registry.histogram(
+    "agentrag_node_duration_seconds", "Graph node execution time.", ["node"]
+)
+LLM_CALL_DURATION = registry.histogram(
+    "agentrag_llm_call_seconds", "Duration of successful LLM calls, by lane.", ["lane"]
+)
+LLM_CALLS = registry.counter(
+    "agentrag_llm_calls_total", "LLM calls made by each graph node.", ["node"]
+)
+LLM_TOKENS = registry.counter(
+    "agentrag_llm_tokens_total", "LLM tokens used by each graph node.", ["node", "kind"]
+)
+REWRITE_LOOPS = registry.histogram(
+    "agentrag_rewrite_loops",
+    "Rewrite iterations per answered question.",
+    buckets=(0, 1, 2, 3, 5),
+)
+QUESTIONS = registry.counter(
+    "agentrag_questions_total", "Questions answered, by outcome.", ["outcome"]
+)
+CONTEXT_TOKENS = registry.counter(
+    "agentrag_context_tokens_total",
+    "Estimated answer-context tokens before (raw) and after (packed) packing.",
+    ["kind"],
+)
+INGESTION_STAGE = registry.histogram(
+    "agentrag_ingestion_stage_seconds",
+    "Time spent per ingestion stage step (page parse, batch embed, batch write).",
+    ["stage"],
+)
+INGESTION_ITEMS = registry.counter(
+    "agentrag_ingestion_items_total", "Pages and chunks processed by ingestion.", ["kind"]
+)
+
+
+def _record(key: str, value: float):
+    timings = request_timings.get()
+    if timings is not None:
+        timings[key] = timings.get(key, 0) + value
+
+
+def instrument_node(name: str):
+    """Decorator timing a graph node and attributing its LLM calls to it."""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            token = current_node.set(name)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                current_node.reset(token)
+                NODE_DURATION.observe(elapsed, node=name)
+                timings = request_timings.get()
+                if timings is not None:
+                    timings.setdefault("nodes", []).append(
+                        {"node": name, "seconds": round(elapsed, 4)}
+                    )
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def ingestion_stage(stage: str):
+    """Time one step of an ingestion stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        INGESTION_STAGE.observe(time.perf_counter() - start, stage=stage)
+
+
+class LLMUsageCallback(BaseCallbackHandler):
+    """Counts LLM calls and token usage per graph node."""
+
+    def on_llm_end(self, response, **kwargs):
+        node = current_node.get() or "unknown"
+        LLM_CALLS.inc(node=node)
+        _record("llm_calls", 1)
+
+        prompt_tokens = completion_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    prompt_tokens += usage.get("input_tokens", 0)
+                    completion_tokens += usage.get("output_tokens", 0)
+        if not prompt_tokens and not completion_tokens:
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            prompt_tokens = usage.get("prompt_tokens", 0)
+            completion_tokens = usage.get("completion_tokens", 0)
+
+        LLM_TOKENS.inc(prompt_tokens, node=node, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, node=node, kind="completion")
+        _record("prompt_tokens", prompt_tokens)
+        _record("completion_tokens", completion_tokens)
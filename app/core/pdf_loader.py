@@ -0,0 +1,133 @@
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+import pypdf
+from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document
+
+from app.config.settings import Settings
+
+settings = Settings()
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool shared by every parallel load, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Forking a threaded server could copy locks held by other threads
+            # (torch, sqlite, logging) into the children; forkserver and spawn
+            # start workers from a clean process
+            method = (
+                "forkserver"
+                if "forkserver" in multiprocessing.get_all_start_methods()
+                else "spawn"
+            )
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(method)
+            )
+        return _pool
+
+
+def start_pool(workers: int = settings.PDF_PARSE_WORKERS):
+    """Create the pool and start its processes, e.g. at startup."""
+    pool = _get_pool(workers)
+    for future in [pool.submit(os.getpid) for _ in range(workers)]:
+        future.result()
+
+
+def shutdown_pool():
+    """Stop the pool's processes; a later load starts a new pool."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def _extract_pages(pdf_path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """Extract the text of pages ``start`` to ``end`` (exclusive) in a worker process."""
+    reader = pypdf.PdfReader(pdf_path)
+    return [
+        (number, reader.pages[number].extract_text(extraction_mode="plain").strip())
+        for number in range(start, end)
+    ]
+
+
+def _load_pages(pdf_path: str) -> List[Document]:
+    return PyPDFLoader(pdf_path).load()
+
+
+def load_in_pool(pdf_path: str, workers: int = settings.PDF_PARSE_WORKERS) -> Future:
+    """Parse a whole PDF in the shared process pool; the future yields its pages."""
+    return _get_pool(workers).submit(_load_pages, pdf_path)
+
+
+class ParallelPDFLoader:
+    """PDF loader that extracts page ranges in a process pool.
+
+    Pages are yielded in order with the same metadata as ``PyPDFLoader``.
+    PDFs shorter than ``min_pages`` are loaded with ``PyPDFLoader`` directly,
+    so small files do not pay the pool overhead.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        workers: int = settings.PDF_PARSE_WORKERS,
+        min_pages: int = settings.PDF_PARALLEL_MIN_PAGES,
+    ):
+        self.file_path = file_path
+        self.workers = workers
+        self.min_pages = min_pages
+
+    def lazy_load(self) -> Iterator[Document]:
+        reader = pypdf.PdfReader(self.file_path)
+        total_pages = len(reader.pages)
+        pages = PyPDFLoader(self.file_path).lazy_load()
+        if self.workers <= 1 or total_pages < self.min_pages:
+            yield from pages
+            return
+
+        # Extracting the first page sequentially gives the exact document-level
+        # metadata PyPDFLoader would attach to every page
+        first = next(pages, None)
+        pages.close()
+        if first is None:
+            return
+        yield first
+
+        page_labels = reader.page_labels
+        # Several ranges per worker keeps the pool balanced across uneven pages
+        range_size = max(1, -(-(total_pages - 1) // (self.workers * 4)))
+        ranges = deque(
+            (start, min(start + range_size, total_pages))
+            for start in range(1, total_pages, range_size)
+        )
+        pool = _get_pool(self.workers)
+        in_flight = deque()
+        while ranges or in_flight:
+            # Bound the number of extracted ranges waiting to be consumed
+            while ranges and len(in_flight) < self.workers * 2:
+                in_flight.append(
+                    pool.submit(_extract_pages, self.file_path, *ranges.popleft())
+                )
+            for number, text in in_flight.popleft().result():
+                yield Document(
+                    page_content=text,
+                    metadata={
+                        **first.metadata,
+                        "page": number,
+                        "page_label": page_labels[number],
+                    },
+                )
+
+    def load(self) -> List[Document]:
+        return list(self.lazy_load())
@@ -0,0 +1,161 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List
+
+from langchain_core.embeddings import Embeddings
+
+from app.config.logging_config import configure_logging
+from app.config.settings import Settings
+from app.core.metrics import registry
+
+settings = Settings()
+
+BATCH_SIZE = registry.histogram(
+    "agentrag_query_embed_batch_size",
+    "Queries embedded per forward pass.",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+WAIT_SECONDS = registry.histogram(
+    "agentrag_query_embed_wait_seconds",
+    "Time a query waited for its batch to start.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+
+class _Request:
+    def __init__(self, text: str):
+        self.text = text
+        self.future: Future = Future()
+        self.submitted = time.perf_counter()
+
+
+class QueryEmbeddingBatcher:
+    """Embed concurrent queries together in one forward pass.
+
+    Callers on any thread submit a query and wait on a future. A dedicated
+    thread takes the first pending query, keeps collecting for up to
+    ``max_wait`` seconds or until ``max_batch`` queries are pending, embeds
+    the distinct texts with one ``embed_documents`` call and resolves every
+    caller. With batching disabled, queries are embedded on the caller's
+    thread.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_batch: int = settings.QUERY_EMBED_MAX_BATCH,
+        max_wait: float = settings.QUERY_EMBED_MAX_WAIT_MS / 1000,
+        enabled: bool = settings.QUERY_EMBED_BATCHING,
+    ):
+        self.logger = configure_logging()
+        self.embeddings = embeddings
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self.enabled = enabled
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.embed_seconds = 0.0
+
+    def _ensure_thread(self):
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="query-embedder", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """Queue a query; the future resolves to its embedding."""
+        request = _Request(text)
+        if not self.enabled:
+            started = time.perf_counter()
+            try:
+                request.future.set_result(self.embeddings.embed_query(text))
+            except Exception as e:
+                request.future.set_exception(e)
+            self._record([request], started, time.perf_counter() - started)
+            return request.future
+        self._ensure_thread()
+        self._queue.put(request)
+        return request.future
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.submit(text).result()
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several queries, batched with each other and with other callers."""
+        futures = [self.submit(text) for text in texts]
+        return [future.result() for future in futures]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await asyncio.wrap_future(self.submit(text))
+
+    def _collect(self) -> List[_Request]:
+        """Block for one request, then gather more until the window closes."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    # Window closed: still take whatever is already waiting
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            texts = list(dict.fromkeys(request.text for request in batch))
+            try:
+                vectors = dict(zip(texts, self.embeddings.embed_documents(texts)))
+            except Exception as e:
+                self.logger.error(
+                    f"[QueryEmbeddingBatcher] Batch of {len(texts)} queries failed: {e}"
+                )
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            for request in batch:
+                request.future.set_result(vectors[request.text])
+            self._record(batch, started, time.perf_counter() - started)
+
+    def _record(self, batch: List[_Request], started: float, embed_seconds: float):
+        waits = [started - request.submitted for request in batch]
+        BATCH_SIZE.observe(len(batch))
+        for wait in waits:
+            WAIT_SECONDS.observe(wait)
+        with self._stats_lock:
+            self.requests += len(batch)
+            self.batches += 1
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+            self.wait_seconds += sum(waits)
+            self.max_wait_seconds = max(self.max_wait_seconds, *waits)
+            self.embed_seconds += embed_seconds
+
+    def stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+                "max_batch_size": self.max_batch_seen,
+                "mean_wait_seconds": self.wait_seconds / self.requests if self.requests else 0.0,
+                "max_wait_seconds": self.max_wait_seconds,
+                "embed_seconds": self.embed_seconds,
+                "pending": self._queue.qsize(),
+            }
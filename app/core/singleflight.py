@@ -0,0 +1,59 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from app.core.metrics import registry
+
+COALESCED = registry.counter(
+    "agentrag_singleflight_calls_total",
+    "Calls that ran the work (leader) or shared a call in progress (follower).",
+    ["role"],
+)
+
+
+class SingleFlight:
+    """Share one in-progress coroutine among concurrent callers with the same key.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it runs await the same task. Nothing is kept once it finishes, so
+    results are never stale. The task is shielded, so a cancelled caller
+    does not cancel the work for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(
+        self, key: Hashable, func: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """Run ``func()`` once per key at a time.
+
+        Returns the result and whether it was shared with an earlier caller.
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if shared:
+            self.followers += 1
+            COALESCED.inc(role="follower")
+        else:
+            self.leaders += 1
+            COALESCED.inc(role="leader")
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task), shared
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception retrieved even if every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "followers": self.followers,
+        }
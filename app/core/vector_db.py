@@ -1,95 +1,872 @@
+import hashlib
+import itertools
 import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import chromadb
 from langchain_chroma import Chroma
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_huggingface.embeddings.huggingface import HuggingFaceEmbeddings
+from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from app.config.logging_config import configure_logging
 from app.config.settings import Settings
+from app.core.embedding_cache import CachedEmbeddings
+from app.core.embeddings import cache_namespace, get_embeddings
+from app.core.flat_index import FlatIndex
+from app.core.keyword_index import KeywordIndex, reciprocal_rank_fusion
+from app.core.metrics import INGESTION_ITEMS, ingestion_stage, registry
+from app.core.pdf_loader import ParallelPDFLoader
+from app.core.pipeline import batched, prefetch
+from app.core.query_embedder import QueryEmbeddingBatcher
 
 settings = Settings()
 
+DEFAULT_COLLECTION = "default"
+_COLLECTION_PATTERN = re.compile(r"^[A-Za-z0-9](?:[A-Za-z0-9_-]{0,48}[A-Za-z0-9])?$")
+
+# Index versions are unique across collections and reopened handles, so a
+# version seen before an eviction is never reused afterwards
+_index_versions = itertools.count(1)
+
+
+class CollectionNotFoundError(LookupError):
+    """Raised when a collection that must already exist does not."""
+
+
+class DocumentExistsError(ValueError):
+    """Raised when an upload would replace a different file of the same name."""
+
+
+def validate_collection(collection: str) -> str:
+    """Return the collection ID, or raise ValueError if it is not allowed."""
+    if not _COLLECTION_PATTERN.match(collection or ""):
+        raise ValueError(
+            "Collection IDs are 1-50 letters, digits, '-' or '_', "
+            "starting and ending with a letter or digit"
+        )
+    return collection
+
+
+def chroma_collection_name(collection: str) -> str:
+    # The default collection keeps the name used before collections existed
+    if collection == DEFAULT_COLLECTION:
+        return "langchain"
+    return f"collection_{collection}"
+
+
+def keyword_index_path(collection: str) -> str:
+    if collection == DEFAULT_COLLECTION:
+        return settings.KEYWORD_INDEX_PATH
+    root, extension = os.path.splitext(settings.KEYWORD_INDEX_PATH)
+    return f"{root}.{collection}{extension}"
+
+
+def _client_settings() -> chromadb.config.Settings:
+    return chromadb.config.Settings(
+        anonymized_telemetry=False,
+        is_persistent=True,
+        # Let Chroma evict loaded HNSW segments once over the memory limit
+        chroma_segment_cache_policy="LRU" if settings.CHROMA_MEMORY_LIMIT_MB else None,
+        chroma_memory_limit_bytes=settings.CHROMA_MEMORY_LIMIT_MB * 1024 * 1024,
+    )
+
+
+def default_directory(engine: str = settings.VECTOR_ENGINE) -> str:
+    """Where the selected vector engine stores its collections."""
+    return settings.FLAT_INDEX_DIR if engine == "flat" else settings.PERSIST_DIR
+
+
+class ChromaEngine:
+    """A Chroma collection, behind the same interface as ``FlatIndex``."""
+
+    itemsize = 4  # float32 vectors
+
+    def __init__(self, collection: str, persist_directory: str, embedding_function):
+        self.db = Chroma(
+            collection_name=chroma_collection_name(collection),
+            persist_directory=persist_directory,
+            embedding_function=embedding_function,
+            client_settings=_client_settings(),
+        )
+
+    @staticmethod
+    def _client(persist_directory: str) -> chromadb.ClientAPI:
+        return chromadb.PersistentClient(
+            path=persist_directory, settings=_client_settings()
+        )
+
+    @classmethod
+    def exists(cls, collection: str, persist_directory: str) -> bool:
+        if not os.path.exists(persist_directory):
+            return False
+        names = cls._client(persist_directory).list_collections()
+        return chroma_collection_name(collection) in names
+
+    @classmethod
+    def list_collections(cls, persist_directory: str) -> List[str]:
+        if not os.path.exists(persist_directory):
+            return []
+        collections = []
+        for name in cls._client(persist_directory).list_collections():
+            if name == chroma_collection_name(DEFAULT_COLLECTION):
+                collections.append(DEFAULT_COLLECTION)
+            elif name.startswith("collection_"):
+                collections.append(name[len("collection_") :])
+        return collections
+
+    def count(self) -> int:
+        return self.db._collection.count()
+
+    def stamp(self) -> None:
+        # An open Chroma client does not see other processes' writes anyway
+        return None
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        document_id: Optional[str] = None,
+        include: Sequence[str] = ("metadatas",),
+    ) -> Dict[str, list]:
+        where = {"document_id": document_id} if document_id is not None else None
+        return self.db.get(ids=ids, where=where, include=list(include))
+
+    def upsert(self, ids, embeddings, metadatas, documents):
+        self.db._collection.upsert(
+            ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents
+        )
+
+    def update_metadatas(self, ids, metadatas):
+        self.db._collection.update(ids=ids, metadatas=metadatas)
+
+    def delete(self, ids):
+        self.db.delete(ids=ids)
+
+    def query(
+        self, embeddings: Sequence[Sequence[float]], k: int
+    ) -> List[List[Tuple[Document, float]]]:
+        """Top ``k`` chunks and cosine similarities for each query vector."""
+        result = self.db._collection.query(
+            query_embeddings=embeddings,
+            n_results=k,
+            include=["documents", "metadatas", "distances"],
+        )
+        # Chroma returns squared L2 distances; for normalized embeddings the
+        # cosine similarity is 1 - d / 2
+        return [
+            [
+                (Document(id=i, page_content=text, metadata=meta or {}), 1 - distance / 2)
+                for i, text, meta, distance in zip(*columns)
+            ]
+            for columns in zip(
+                result["ids"],
+                result["documents"],
+                result["metadatas"],
+                result["distances"],
+            )
+        ]
+
+
+def flat_collection_directory(collection: str, root: str) -> str:
+    return os.path.join(root, collection)
+
+
+def _flat_collections(root: str) -> List[str]:
+    if not os.path.isdir(root):
+        return []
+    return [
+        name
+        for name in os.listdir(root)
+        if FlatIndex.exists(flat_collection_directory(name, root))
+    ]
+
+
+@lru_cache(maxsize=None)
+def shared_embeddings(model_name: str = settings.EMBED_MODEL_NAME) -> CachedEmbeddings:
+    """Embedding model shared by every collection, loaded on first use."""
+    embeddings = CachedEmbeddings(
+        get_embeddings(model_name=model_name),
+        model_name=cache_namespace(model_name=model_name),
+    )
+    registry.gauge(
+        "agentrag_embedding_cache",
+        "Embedding cache statistics.",
+        "stat",
+        embeddings.stats,
+    )
+    return embeddings
+
+
+@lru_cache(maxsize=None)
+def shared_query_embedder(
+    model_name: str = settings.EMBED_MODEL_NAME,
+) -> QueryEmbeddingBatcher:
+    """Query embedder batching concurrent questions of every collection."""
+    # Queries bypass the chunk cache, as in ``CachedEmbeddings.embed_query``
+    embedder = QueryEmbeddingBatcher(shared_embeddings(model_name).embeddings)
+    registry.gauge(
+        "agentrag_query_embedder",
+        "Query embedding batch statistics.",
+        "stat",
+        embedder.stats,
+    )
+    return embedder
+
+
+@lru_cache(maxsize=None)
+def embedding_dimension(model_name: str = settings.EMBED_MODEL_NAME) -> int:
+    return len(shared_embeddings(model_name).embed_query("dimension"))
+
 
 class VectorStore:
-    _instance = None
+    """One named collection: vectors in the selected engine plus a keyword index.
 
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance.__init__(*args, **kwargs)
-        return cls._instance
+    The engine is Chroma or, with ``VECTOR_ENGINE=flat``, a memory-mapped
+    ``FlatIndex`` with exact search.
+    """
 
     def __init__(
         self,
+        collection=DEFAULT_COLLECTION,
+        persist_directory=None,
         model_name=settings.EMBED_MODEL_NAME,
-        persist_directory=settings.PERSIST_DIR,
+        engine=settings.VECTOR_ENGINE,
     ):
-        """Initialize the vector store with the specified embedding model."""
-        if not hasattr(self, "initialized"):  # Ensure initialization happens only once
-            self.logger = configure_logging()
-            self.embedding_function = HuggingFaceEmbeddings(model_name=model_name)
-            self.persist_directory = persist_directory
-            self.db = None
-            if os.path.exists(persist_directory):
-                try:
-                    self.db = Chroma(
-                        persist_directory=persist_directory,
-                        embedding_function=self.embedding_function,
-                        client_settings=chromadb.config.Settings(
-                            anonymized_telemetry=False, is_persistent=True
-                        ),
-                    )
-                    self.logger.info(
-                        "[__init__] Loaded existing vector store from disk"
-                    )
-                except Exception as e:
-                    self.logger.error(
-                        f"[__init__] Error loading existing vector store: {e}"
-                    )
-            self.initialized = True
+        """Open the collection if it exists on disk."""
+        if engine not in ("chroma", "flat"):
+            raise ValueError(f"Unknown vector engine: {engine}")
+        self.logger = configure_logging()
+        self.collection = validate_collection(collection)
+        self.model_name = model_name
+        self.embedding_function = shared_embeddings(model_name)
+        self.query_embedder = shared_query_embedder(model_name)
+        self.engine = engine
+        self.persist_directory = persist_directory or default_directory(engine)
+        self.db = None
+        self._version = next(_index_versions)
+        self._seen_stamp = None  # Collection files as of the last check
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._open_lock = threading.Lock()
+        self.keyword_index = KeywordIndex(keyword_index_path(collection))
+        if self._exists():
+            try:
+                self.db = self._open_db()
+                self.logger.info(
+                    f"[__init__] Loaded collection '{collection}' from disk"
+                )
+                if len(self.keyword_index) != self.db.count():
+                    # Missing or behind the vectors, e.g. after an interrupted run
+                    self._rebuild_keyword_index()
+            except Exception as e:
+                self.logger.error(
+                    f"[__init__] Error loading collection '{collection}': {e}"
+                )
+        self._seen_stamp = self._disk_stamp()
+
+    def _exists(self) -> bool:
+        """Whether the collection was created before."""
+        if self.engine == "flat":
+            return FlatIndex.exists(
+                flat_collection_directory(self.collection, self.persist_directory)
+            )
+        return ChromaEngine.exists(self.collection, self.persist_directory)
+
+    def _open_db(self):
+        """Open (or create) the persistent collection in the selected engine."""
+        if self.engine == "flat":
+            return FlatIndex(
+                flat_collection_directory(self.collection, self.persist_directory)
+            )
+        return ChromaEngine(
+            self.collection, self.persist_directory, self.embedding_function
+        )
+
+    def _rebuild_keyword_index(self):
+        """Build the keyword index from the chunks already stored."""
+        stored = self.db.get(include=["documents"])
+        if not stored["ids"]:
+            return
+        self.keyword_index.clear()
+        self.keyword_index.add(zip(stored["ids"], stored["documents"]))
+        self.keyword_index.save()
+        self.logger.info(
+            f"[__init__] Rebuilt keyword index over {len(stored['ids'])} chunks"
+        )
 
     def is_initialized(self) -> bool:
         """Check if the vector store is initialized."""
+        self.refresh()
         return self.db is not None
 
-    def initialize_from_pdf(
+    @property
+    def index_version(self) -> int:
+        """Changes whenever the content does, through this process or another."""
+        self.refresh()
+        return self._version
+
+    def _disk_stamp(self) -> tuple:
+        """Identity of the collection's files, shared by every worker process."""
+        if self.db is not None:
+            db_stamp = self.db.stamp()
+        elif self.engine == "flat":
+            db_stamp = self._exists()
+        else:
+            db_stamp = None
+        return db_stamp, self.keyword_index.stamp()
+
+    def refresh(self) -> bool:
+        """Pick up writes another process made to the collection files.
+
+        Returns whether anything changed since the last check; the index
+        version then moves on, so answers cached by this process are dropped.
+        """
+        if self._disk_stamp() == self._seen_stamp:
+            return False
+        with self._open_lock:
+            if self.db is None and self.engine == "flat" and self._exists():
+                self.db = self._open_db()
+            self.keyword_index.refresh()
+            self._changed()
+        return True
+
+    def _changed(self):
+        """Move the index version on after the content changed."""
+        self._version = next(_index_versions)
+        self._seen_stamp = self._disk_stamp()
+
+    @staticmethod
+    def document_id(document_name: str) -> str:
+        """Stable ID of a document across re-uploads of new versions."""
+        return hashlib.sha256(document_name.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def file_hash(path: str) -> str:
+        """Content hash of a file, read in blocks."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def chunk_id(document_id: str, page: int, offset: int, text: str) -> str:
+        """Deterministic chunk ID from its document, page, offset and content."""
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        return f"{document_id}:{page}:{offset}:{content_hash}"
+
+    @staticmethod
+    def _check_replace(document_name: str, existing: Dict[str, dict], file_hash: str):
+        """Refuse to replace a stored document with a different file.
+
+        Every chunk carries the hash of the file it was written from, so
+        completing an interrupted upload of the same file is never a conflict.
+        """
+        stored = {meta.get("file_hash") for meta in existing.values()} - {"", None}
+        if stored and file_hash not in stored:
+            raise DocumentExistsError(
+                f"A different file named '{document_name}' is already indexed. "
+                "Upload with replace=true to update it."
+            )
+
+    def check_upload(self, pdf_path: str, document_name: str):
+        """Raise DocumentExistsError if ``pdf_path`` would replace another file."""
+        existing = self._existing_chunks(self.document_id(document_name))
+        if existing:
+            self._check_replace(document_name, existing, self.file_hash(pdf_path))
+
+    def _existing_chunks(self, document_id: str) -> Dict[str, dict]:
+        """Map chunk ID to metadata for every stored chunk of a document."""
+        if self.db is None:
+            return {}
+        stored = self.db.get(document_id=document_id, include=["metadatas"])
+        return dict(zip(stored["ids"], stored["metadatas"]))
+
+    def busy(self) -> bool:
+        """Whether a document of this collection is being ingested."""
+        with self._locks_guard:
+            return any(lock.locked() for lock in self._locks.values())
+
+    def memory(self) -> Dict[str, int]:
+        """Approximate in-memory size: vectors and keyword index entries."""
+        chunks = self.db.count() if self.db is not None else 0
+        itemsize = self.db.itemsize if self.db is not None else 4
+        keyword = self.keyword_index.stats()
+        return {
+            "chunks": chunks,
+            "vector_bytes": chunks * embedding_dimension(self.model_name) * itemsize,
+            "keyword_terms": keyword["terms"],
+            "keyword_postings": keyword["postings"],
+        }
+
+    def _document_lock(self, document_id: str) -> threading.Lock:
+        """Lock serializing concurrent ingestion of the same document."""
+        with self._locks_guard:
+            return self._locks.setdefault(document_id, threading.Lock())
+
+    def _embed_batch(self, batch: list, progress: Optional[Callable] = None):
+        """Embed a batch of (chunk ID, document) pairs."""
+        with ingestion_stage("embed"):
+            embeddings = self.embedding_function.embed_documents(
+                [doc.page_content for _, doc in batch]
+            )
+        INGESTION_ITEMS.inc(len(batch), kind="chunks_embedded")
+        if progress:
+            progress("chunks_embedded", len(batch))
+        return batch, embeddings
+
+    def _write_batch(
+        self, batch: list, embeddings: list, progress: Optional[Callable] = None
+    ):
+        """Write an embedded batch of (chunk ID, document) pairs to the DB."""
+        with ingestion_stage("write"):
+            self.db.upsert(
+                ids=[chunk_id for chunk_id, _ in batch],
+                embeddings=embeddings,
+                metadatas=[doc.metadata for _, doc in batch],
+                documents=[doc.page_content for _, doc in batch],
+            )
+            self.keyword_index.add(
+                (chunk_id, doc.page_content) for chunk_id, doc in batch
+            )
+        INGESTION_ITEMS.inc(len(batch), kind="chunks_written")
+        if progress:
+            progress("chunks_written", len(batch))
+
+    def index_pdf(
         self,
         pdf_path,
+        document_name=None,
         chunk_size=settings.CHUNKING_PARAM.get("size"),
         chunk_overlap=settings.CHUNKING_PARAM.get("overlap"),
-    ):
-        """Initialize vector DB with PDF content."""
+        progress: Optional[Callable[[str, int], None]] = None,
+        pages: Optional[Iterable[Document]] = None,
+        batch_size: int = settings.EMBED_BATCH_SIZE,
+        save_keyword_index: bool = True,
+        replace: bool = False,
+    ) -> Dict[str, int]:
+        """Incrementally upsert a PDF into the vector DB.
 
-        self.logger.debug(f"[initialize_from_pdf] Loading PDF: {pdf_path}")
-        try:
-            loader = PyPDFLoader(pdf_path)
-            documents = loader.load()
-            self.logger.debug(
-                f"[initialize_from_pdf] Loaded {len(documents)} pages from PDF"
+        Chunks keep deterministic IDs, so chunks that are already stored are
+        skipped. A document is identified by its name: a different file under
+        a stored name raises DocumentExistsError unless ``replace`` is set, in
+        which case chunks left over from the previous version are deleted.
+        ``progress(stage, count)`` is called as pages are
+        parsed and chunks are embedded and written. ``pages`` supplies pages
+        parsed elsewhere instead of loading the file. Bulk loaders can pass
+        ``save_keyword_index=False`` and save the keyword index themselves.
+        Returns counts of added, skipped and deleted chunks.
+        """
+        document_name = document_name or os.path.basename(pdf_path)
+        document_id = self.document_id(document_name)
+        with self._document_lock(document_id), ingestion_stage("document"):
+            return self._index_pdf(
+                pdf_path,
+                document_name,
+                document_id,
+                chunk_size,
+                chunk_overlap,
+                progress,
+                pages=pages,
+                batch_size=batch_size,
+                save_keyword_index=save_keyword_index,
+                replace=replace,
             )
 
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap,
-                length_function=len,
-                is_separator_regex=False,
-            )
-            docs = text_splitter.split_documents(documents)
-            self.logger.debug(f"[initialize_from_pdf] Split into {len(docs)} chunks")
-
-            self.db = Chroma.from_documents(
-                documents=docs,
-                embedding=self.embedding_function,
-                persist_directory=self.persist_directory,
-                client_settings=chromadb.config.Settings(
-                    anonymized_telemetry=False, is_persistent=True
-                ),
+    def _index_pdf(
+        self,
+        pdf_path,
+        document_name,
+        document_id,
+        chunk_size,
+        chunk_overlap,
+        progress,
+        pages=None,
+        batch_size=settings.EMBED_BATCH_SIZE,
+        save_keyword_index=True,
+        replace=False,
+    ) -> Dict[str, int]:
+        file_hash = self.file_hash(pdf_path)
+
+        existing = self._existing_chunks(document_id)
+        if any(
+            meta.get("complete_hash") == file_hash for meta in existing.values()
+        ) and all(meta.get("file_hash") == file_hash for meta in existing.values()):
+            self.logger.info(
+                f"[index_pdf] '{document_name}' is unchanged, skipping re-indexing"
             )
+            return {"added": 0, "skipped": len(existing), "deleted": 0}
+        if not replace:
+            self._check_replace(document_name, existing, file_hash)
+
+        self.logger.debug(f"[index_pdf] Streaming PDF: {pdf_path}")
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len,
+            is_separator_regex=False,
+            add_start_index=True,
+        )
+        seen = set()
+
+        def new_chunks():
+            """Parse page by page and yield chunks that are not stored yet."""
+            if pages is None:
+                loaded = ParallelPDFLoader(pdf_path).lazy_load()
+            else:
+                loaded = iter(pages)
+            while True:
+                with ingestion_stage("parse"):
+                    page = next(loaded, None)
+                if page is None:
+                    return
+                INGESTION_ITEMS.inc(kind="pages_parsed")
+                if progress:
+                    progress("pages_parsed", 1)
+                with ingestion_stage("split"):
+                    page_chunks = text_splitter.split_documents([page])
+                for doc in page_chunks:
+                    chunk_id = self.chunk_id(
+                        document_id,
+                        doc.metadata.get("page", 0),
+                        doc.metadata.get("start_index", 0),
+                        doc.page_content,
+                    )
+                    if chunk_id in seen:
+                        continue
+                    seen.add(chunk_id)
+                    if chunk_id in existing:
+                        continue
+                    doc.metadata.update(
+                        {
+                            "document_id": document_id,
+                            "document_name": document_name,
+                            "file_hash": file_hash,
+                        }
+                    )
+                    yield chunk_id, doc
+
+        with self._open_lock:
+            # Chroma client creation is not thread-safe for a new directory, and
+            # a new flat index must be created once
+            if self.db is None:
+                self.db = self._open_db()
+
+        # Parse/split, embed and write run as overlapping stages connected by
+        # bounded queues, so memory is bounded by the batch size
+        depth = settings.INGEST_PIPELINE_DEPTH
+        batches = prefetch(batched(new_chunks(), batch_size), depth)
+        embedded = prefetch(
+            (self._embed_batch(batch, progress) for batch in batches), depth
+        )
+        written: Dict[str, dict] = {}
+        stale: List[str] = []
+        try:
+            for batch, embeddings in embedded:
+                self._write_batch(batch, embeddings, progress)
+                written.update((chunk_id, doc.metadata) for chunk_id, doc in batch)
+            self.logger.debug(f"[index_pdf] Wrote {len(written)} new chunks")
+
+            stale = [chunk_id for chunk_id in existing if chunk_id not in seen]
+            kept = [chunk_id for chunk_id in existing if chunk_id in seen]
+            if stale:
+                self.db.delete(stale)
+                self.keyword_index.remove(stale)
+            # Kept chunks of the previous version take the new hash, and one
+            # chunk records that the whole file is stored, so an interrupted
+            # run never looks unchanged. Only metadata is updated, and chunks
+            # written above already carry the hash, so they are not rewritten
+            complete = {**{chunk_id: existing[chunk_id] for chunk_id in kept}, **written}
+            updates = {
+                chunk_id: meta
+                for chunk_id, meta in complete.items()
+                if meta.get("file_hash") != file_hash
+            }
+            marker = next(iter(updates or complete), None)
+            if marker is not None:
+                updates[marker] = {**complete[marker], "complete_hash": file_hash}
+                self.db.update_metadatas(
+                    ids=list(updates),
+                    metadatas=[
+                        {**meta, "file_hash": file_hash} for meta in updates.values()
+                    ],
+                )
+        finally:
+            # Partial writes are visible to searches too
+            if written or stale:
+                if save_keyword_index:
+                    self.keyword_index.save()
+                self._changed()
+
+        stats = {"added": len(written), "skipped": len(kept), "deleted": len(stale)}
+        self.logger.info(f"[index_pdf] Indexed '{document_name}': {stats}")
+        self.logger.debug(
+            f"[index_pdf] Embedding cache: {self.embedding_function.stats()}"
+        )
+        return stats
+
+    def initialize_from_pdf(
+        self,
+        pdf_path,
+        document_name=None,
+        chunk_size=settings.CHUNKING_PARAM.get("size"),
+        chunk_overlap=settings.CHUNKING_PARAM.get("overlap"),
+    ):
+        """Initialize vector DB with PDF content."""
+        try:
+            self.index_pdf(pdf_path, document_name, chunk_size, chunk_overlap)
             return True  # Return True on success
         except Exception as e:
             self.logger.error(
                 f"[initialize_from_pdf] Error initializing vector store: {e}"
             )
             return False  # Return False on failure
+
+    def list_documents(self) -> List[dict]:
+        """List indexed documents with their chunk counts."""
+        if self.db is None:
+            return []
+        stored = self.db.get(include=["metadatas"])
+        documents: Dict[str, dict] = {}
+        for meta in stored["metadatas"]:
+            document_id = meta.get("document_id")
+            if document_id is None:  # Chunks indexed before stable IDs existed
+                continue
+            entry = documents.setdefault(
+                document_id,
+                {
+                    "document_id": document_id,
+                    "document_name": meta.get("document_name"),
+                    "file_hash": meta.get("file_hash"),
+                    "chunks": 0,
+                },
+            )
+            entry["chunks"] += 1
+        return list(documents.values())
+
+    def delete_document(self, document_id: str) -> int:
+        """Delete every chunk of a document. Returns the number of chunks removed."""
+        existing = self._existing_chunks(document_id)
+        if existing:
+            self.db.delete(list(existing))
+            self.keyword_index.remove(existing)
+            self.keyword_index.save()
+            self._changed()
+            self.logger.info(
+                f"[delete_document] Deleted {len(existing)} chunks of {document_id}"
+            )
+        return len(existing)
+
+    def search(
+        self,
+        query: str,
+        k: int = settings.RETRIEVAL_K,
+        fetch_k: int = settings.RETRIEVAL_FETCH_K,
+    ) -> List[Document]:
+        """Retrieve the top ``k`` chunks for a query.
+
+        Dense similarity results are fused with keyword (BM25) results by
+        reciprocal rank fusion when hybrid search is enabled. The fused score
+        and the dense cosine similarity, when available, are added to each
+        chunk's metadata as ``retrieval_score`` and ``vector_score``.
+        """
+        return self.search_many([query], k=k, fetch_k=fetch_k)[0]
+
+    def search_many(
+        self,
+        queries: List[str],
+        k: int = settings.RETRIEVAL_K,
+        fetch_k: int = settings.RETRIEVAL_FETCH_K,
+    ) -> List[List[Document]]:
+        """``search`` for several queries, with one batched dense lookup."""
+        self.refresh()
+        vectors = self.query_embedder.embed_queries(queries)
+        dense_results = self.db.query(vectors, k=fetch_k)
+
+        rankings, documents = [], {}
+        for query, dense in zip(queries, dense_results):
+            for doc, _ in dense:
+                documents[doc.id] = doc
+            if not settings.HYBRID_SEARCH_ENABLED:
+                ranked = [(doc.id, score) for doc, score in dense[:k]]
+            else:
+                keyword = self.keyword_index.search(query, k=fetch_k)
+                ranked = reciprocal_rank_fusion(
+                    {
+                        "vector": [doc.id for doc, _ in dense],
+                        "keyword": [chunk_id for chunk_id, _ in keyword],
+                    },
+                    weights=settings.RRF_WEIGHTS,
+                    k=settings.RRF_K,
+                )[:k]
+            rankings.append((ranked, {doc.id: score for doc, score in dense}))
+
+        missing = {
+            chunk_id
+            for ranked, _ in rankings
+            for chunk_id, _ in ranked
+            if chunk_id not in documents
+        }
+        if missing:
+            stored = self.db.get(ids=list(missing), include=["documents", "metadatas"])
+            for chunk_id, text, meta in zip(
+                stored["ids"], stored["documents"], stored["metadatas"]
+            ):
+                documents[chunk_id] = Document(id=chunk_id, page_content=text, metadata=meta)
+
+        results = []
+        for ranked, vector_scores in rankings:
+            found = []
+            for chunk_id, score in ranked:
+                doc = documents.get(chunk_id)
+                if doc is None:  # Removed from the store but still in the keyword index
+                    continue
+                # A copy per query, since the same chunk can rank for several
+                found.append(
+                    Document(
+                        id=chunk_id,
+                        page_content=doc.page_content,
+                        metadata={
+                            **doc.metadata,
+                            "retrieval_score": score,
+                            "vector_score": vector_scores.get(chunk_id),
+                        },
+                    )
+                )
+            results.append(found)
+        return results
+
+
+class VectorStoreManager:
+    """Bounded LRU of open collections.
+
+    An open collection holds an engine handle and its keyword index in memory.
+    At most ``max_open`` stay open, and collections idle for longer than
+    ``idle_seconds`` are closed on a later access. Collections with an
+    ingestion in progress are never evicted.
+    """
+
+    def __init__(
+        self,
+        max_open: int = settings.MAX_OPEN_COLLECTIONS,
+        idle_seconds: float = settings.COLLECTION_IDLE_SECONDS,
+        persist_directory: Optional[str] = None,
+        engine: str = settings.VECTOR_ENGINE,
+    ):
+        self.logger = configure_logging()
+        self.max_open = max(1, max_open)
+        self.idle_seconds = idle_seconds
+        self.engine = engine
+        self.persist_directory = persist_directory or default_directory(engine)
+        self._stores: "OrderedDict[str, VectorStore]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._open_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.evicted = 0
+
+    def get(self, collection: str = DEFAULT_COLLECTION, create: bool = True) -> VectorStore:
+        """Return the open collection, opening it (and evicting others) if needed.
+
+        With ``create=False`` a collection that is neither open nor stored
+        raises CollectionNotFoundError instead of taking a slot in the LRU.
+        """
+        validate_collection(collection)
+        with self._lock:
+            is_open = collection in self._stores
+        if not (create or is_open or self.exists(collection)):
+            raise CollectionNotFoundError(f"Collection '{collection}' not found.")
+        with self._lock:
+            open_lock = self._open_locks.setdefault(collection, threading.Lock())
+        # Opening loads the keyword index, so only callers of the same
+        # collection wait for it
+        with open_lock:
+            with self._lock:
+                store = self._stores.get(collection)
+                if store is not None:
+                    self._touch(collection)
+                    return store
+            store = VectorStore(
+                collection, persist_directory=self.persist_directory, engine=self.engine
+            )
+            with self._lock:
+                self._stores[collection] = store
+                self._touch(collection)
+                self.opened += 1
+            return store
+
+    def _touch(self, collection: str):
+        self._stores.move_to_end(collection)
+        self._last_used[collection] = time.monotonic()
+        self._evict()
+
+    def _evict(self):
+        """Close least recently used or idle collections that are not busy."""
+        now = time.monotonic()
+        newest = next(reversed(self._stores))
+        for collection, store in list(self._stores.items()):
+            over_capacity = len(self._stores) > self.max_open
+            idle = now - self._last_used[collection] > self.idle_seconds
+            if collection == newest or not (over_capacity or idle) or store.busy():
+                continue
+            del self._stores[collection]
+            del self._last_used[collection]
+            self.evicted += 1
+            self.logger.info(f"[VectorStoreManager] Closed collection '{collection}'")
+
+    def exists(self, collection: str) -> bool:
+        """Whether the collection is stored; the default one always exists."""
+        if collection == DEFAULT_COLLECTION:
+            return True
+        if self.engine == "flat":
+            return FlatIndex.exists(
+                flat_collection_directory(collection, self.persist_directory)
+            )
+        return ChromaEngine.exists(collection, self.persist_directory)
+
+    def list_collections(self) -> List[str]:
+        """IDs of every collection stored on disk."""
+        if self.engine == "flat":
+            return sorted(_flat_collections(self.persist_directory))
+        return sorted(ChromaEngine.list_collections(self.persist_directory))
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "open": len(self._stores),
+                "opened": self.opened,
+                "evicted": self.evicted,
+            }
+
+    def stats(self) -> dict:
+        """Open collections with their idle time and approximate memory."""
+        with self._lock:
+            now = time.monotonic()
+            stores = [
+                (collection, store, now - self._last_used[collection])
+                for collection, store in self._stores.items()
+            ]
+        counts = self.counts()
+        return {
+            **counts,
+            "max_open": self.max_open,
+            "open_collections": {
+                collection: {"idle_seconds": round(idle, 1), **store.memory()}
+                for collection, store, idle in stores
+            },
+        }
+
+
+vector_stores = VectorStoreManager()
+registry.gauge(
+    "agentrag_collections", "Open collection handles.", "stat", vector_stores.counts
+)
+
+
+def get_vector_store(collection: str = DEFAULT_COLLECTION) -> VectorStore:
+    """The open handle of a collection."""
+    return vector_stores.get(collection)
@@ -1,37 +1,153 @@
+import time
+
+_import_start = time.perf_counter()
+
+import asyncio
+import json
 import os
-from contextlib import asynccontextmanager
+import uuid
+from contextlib import asynccontextmanager, contextmanager
 from tempfile import NamedTemporaryFile
 
 import uvicorn
-from fastapi import Depends, FastAPI, File, HTTPException, Request, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
-from app.api.models import AnswerResponse, QuestionRequest
-from app.config.logging_config import configure_logging
+from app.api.models import AnswerResponse, JobStatus, QuestionRequest
+from app.config.logging_config import configure_logging, dropped_records, request_id
 from app.config.settings import Settings
-from app.core.graph.master_graph import generate_response
-from app.core.vector_db import VectorStore  # Import the VectorStore class
+from app.core.graph.budget import deadline_after
+from app.core.graph.master_graph import (
+    answer_cache_stats,
+    generate_response,
+    get_graph_llm,
+    pre_grader,
+    stream_response,
+)
+from app.core.ingestion import IngestionQueue, QueueFullError
+from app.core.metrics import registry
+from app.core.pdf_loader import shutdown_pool, start_pool
+from app.core.vector_db import (  # Import the VectorStore class
+    DEFAULT_COLLECTION,
+    CollectionNotFoundError,
+    DocumentExistsError,
+    VectorStore,
+    validate_collection,
+    vector_stores,
+)
 
 logger = configure_logging()  # Configure logging
 settings = Settings()
 
+# Startup phase durations in seconds, reported by /ready
+startup_timings = {"imports": round(time.perf_counter() - _import_start, 4)}
+logger.info(f"[startup] imports took {startup_timings['imports']}s")
+
+
+@contextmanager
+def startup_phase(name: str):
+    """Time and log one startup phase."""
+    start = time.perf_counter()
+    yield
+    startup_timings[name] = round(time.perf_counter() - start, 4)
+    logger.info(f"[startup] {name} took {startup_timings[name]}s")
+
+
+def warm_up(app: FastAPI):
+    """Create the heavy objects: vector store, embedding model, LLM client and,
+    once ready, the PDF parse workers."""
+    try:
+        with startup_phase("vector_store"):
+            vector_store = vector_stores.get(DEFAULT_COLLECTION)
+        with startup_phase("embedding_model"):
+            # The first forward pass pays for lazy model initialization
+            vector_store.embedding_function.embed_query("warm up")
+        with startup_phase("llm_client"):
+            get_graph_llm()
+        app.state.ready = True
+        logger.info("Warm-up complete, ready to serve.")
+        if settings.PDF_PARSE_WORKERS > 1:
+            # Only uploads need the parse workers, so questions do not wait for them
+            with startup_phase("pdf_parse_pool"):
+                start_pool()
+    except Exception as e:
+        app.state.warm_up_error = str(e)
+        logger.error(f"[startup] Warm-up failed: {e}")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Initialize heavy objects (e.g., VectorStore) when the app starts
-    app.state.vector_store = VectorStore()
-    logger.info("Initialized VectorStore.")
+    app.state.ready = False
+    app.state.warm_up_error = None
+    app.state.ingestion_queue = IngestionQueue(vector_stores.get)
+    app.state.ingestion_queue.start()
+    registry.gauge(
+        "agentrag_ingestion_queue",
+        "Ingestion queue depth.",
+        "stat",
+        lambda: {"depth": app.state.ingestion_queue.depth()},
+    )
+    if settings.STARTUP_MODE == "lazy":
+        # Serve /health immediately and warm up in the background; /ready
+        # reports when the heavy objects are loaded
+        app.state.warm_up_task = asyncio.create_task(asyncio.to_thread(warm_up, app))
+    else:
+        await asyncio.to_thread(warm_up, app)
     yield
     # Clean up resources when the app shuts down
-    logger.info("Shutting down VectorStore.")
-    del app.state.vector_store
+    logger.info("Shutting down ingestion workers.")
+    app.state.ingestion_queue.shutdown()
+    shutdown_pool()
 
 
 app = FastAPI(lifespan=lifespan)
+registry.gauge(
+    "agentrag_log_records",
+    "Log records dropped because the log queue was full.",
+    "stat",
+    lambda: {"dropped": dropped_records()},
+)
+
+
+@app.middleware("http")
+async def assign_request_id(request: Request, call_next):
+    """Tag the request's log records with an ID, reusing X-Request-ID if sent."""
+    rid = request.headers.get("X-Request-ID", "")[:64] or uuid.uuid4().hex
+    token = request_id.set(rid)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id.reset(token)
+    response.headers["X-Request-ID"] = rid
+    return response
+
+
+def open_collection(collection: str, create: bool = True) -> VectorStore:
+    """Open a collection, rejecting invalid IDs and, unless ``create``, unknown ones."""
+    try:
+        return vector_stores.get(collection, create=create)
+    except CollectionNotFoundError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        logger.warning(f"Invalid collection '{collection}': {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def check_upload(collection: str, pdf_path: str, document_name: str):
+    """Raise DocumentExistsError if the upload would replace a different file."""
+    if vector_stores.exists(collection):
+        vector_stores.get(collection, create=False).check_upload(pdf_path, document_name)
+
 
+def get_vector_store(collection: str = DEFAULT_COLLECTION):
+    # Resolved per request from the ?collection= parameter; a sync dependency,
+    # so opening runs in the threadpool
+    return open_collection(collection, create=False)
 
-def get_vector_store(request: Request):
-    return request.app.state.vector_store
+
+def get_ingestion_queue(request: Request):
+    return request.app.state.ingestion_queue
 
 
 @app.get("/health")
@@ -40,12 +156,30 @@ def health_check():
     return {"status": "ok"}
 
 
-@app.post("/upload-pdf")
+@app.get("/ready")
+def readiness_check(request: Request):
+    content = {
+        "ready": request.app.state.ready,
+        "startup_timings": startup_timings,
+    }
+    if request.app.state.warm_up_error:
+        content["error"] = request.app.state.warm_up_error
+    return JSONResponse(status_code=200 if content["ready"] else 503, content=content)
+
+
+@app.post("/upload-pdf", status_code=202)
 async def upload_pdf(
     file: UploadFile = File(...),
-    vector_store: VectorStore = Depends(get_vector_store),
+    collection: str = Form(DEFAULT_COLLECTION),
+    replace: bool = Form(False),
+    ingestion_queue: IngestionQueue = Depends(get_ingestion_queue),
 ):
-    logger.info(f"Received file upload request: {file.filename}")
+    logger.info(f"Received file upload request: {file.filename} ({collection})")
+
+    try:
+        validate_collection(collection)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     # Check if the uploaded file is a PDF
     if file.content_type != "application/pdf":
@@ -55,34 +189,54 @@ async def upload_pdf(
         logger.error(error_msg)
         raise HTTPException(status_code=400, detail=error_msg)
 
+    # Apply backpressure before reading the upload
+    if ingestion_queue.is_full():
+        error_msg = "Ingestion queue is full, retry later."
+        logger.warning(error_msg)
+        raise HTTPException(status_code=429, detail=error_msg)
+
     # Save the uploaded file temporarily
     try:
         logger.info(f"Saving temporary file for '{file.filename}'...")
         with NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-            contents = await file.read()
-            temp_file.write(contents)
             temp_file_path = temp_file.name
+            # Stream the upload to disk instead of buffering it in memory
+            while contents := await file.read(settings.UPLOAD_CHUNK_SIZE):
+                temp_file.write(contents)
             logger.debug(f"Temporary file saved at: {temp_file_path}")
 
-        # Initialize VectorStore and index the PDF
-        logger.info(f"Indexing PDF file: {file.filename}")
-        success = vector_store.initialize_from_pdf(temp_file_path)
-
-        # Clean up the temporary file
-        logger.debug(f"Cleaning up temporary file: {temp_file_path}")
-        os.unlink(temp_file_path)
-
-        if success:
-            logger.info(f"PDF file '{file.filename}' indexed successfully.")
-            return JSONResponse(
-                status_code=200,
-                content={"message": f"PDF file '{file.filename}' indexed successfully"},
+        if not replace:
+            # Fail fast; the ingestion worker checks again under the document lock
+            await asyncio.to_thread(
+                check_upload, collection, temp_file_path, file.filename
             )
-        else:
-            error_msg = f"Failed to index the PDF file: {file.filename}"
-            logger.error(error_msg)
-            raise HTTPException(status_code=500, detail=error_msg)
 
+        # Hand the file to the ingestion workers; they delete it when done
+        job = ingestion_queue.submit(
+            temp_file_path,
+            document_name=file.filename,
+            collection=collection,
+            replace=replace,
+        )
+        logger.info(f"Queued PDF file '{file.filename}' as job {job.id}.")
+        return JSONResponse(
+            status_code=202,
+            content={
+                "message": f"PDF file '{file.filename}' queued for indexing",
+                "job_id": job.id,
+                "collection": collection,
+                "document_id": VectorStore.document_id(file.filename),
+            },
+        )
+
+    except QueueFullError as e:
+        os.unlink(temp_file_path)
+        logger.warning(str(e))
+        raise HTTPException(status_code=429, detail=str(e))
+    except DocumentExistsError as e:
+        os.unlink(temp_file_path)
+        logger.warning(str(e))
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         # Clean up the temporary file in case of an error
         if "temp_file_path" in locals() and os.path.exists(temp_file_path):
@@ -95,24 +249,69 @@ async def upload_pdf(
         raise HTTPException(status_code=500, detail=error_msg)
 
 
-@app.post("/ask", response_model=AnswerResponse)
-async def ask_questions(
-    body: QuestionRequest, vector_store: VectorStore = Depends(get_vector_store)
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+def get_job(
+    job_id: str, ingestion_queue: IngestionQueue = Depends(get_ingestion_queue)
 ):
+    job = ingestion_queue.get(job_id)
+    if job is None:
+        error_msg = f"Job '{job_id}' not found."
+        logger.warning(error_msg)
+        raise HTTPException(status_code=404, detail=error_msg)
+    return job.to_dict()
+
+
+@app.get("/documents")
+def list_documents(vector_store: VectorStore = Depends(get_vector_store)):
+    logger.info("List documents endpoint accessed.")
+    return {"documents": vector_store.list_documents()}
+
+
+@app.delete("/documents/{document_id}")
+def delete_document(
+    document_id: str, vector_store: VectorStore = Depends(get_vector_store)
+):
+    logger.info(f"Received delete request for document: {document_id}")
+    deleted = vector_store.delete_document(document_id)
+    if not deleted:
+        error_msg = f"Document '{document_id}' not found."
+        logger.warning(error_msg)
+        raise HTTPException(status_code=404, detail=error_msg)
+    return {"message": f"Document '{document_id}' deleted", "chunks_deleted": deleted}
+
+
+@app.get("/collections")
+def list_collections():
+    logger.info("List collections endpoint accessed.")
+    return {"collections": vector_stores.list_collections(), **vector_stores.stats()}
+
+
+@app.post("/ask", response_model=AnswerResponse)
+async def ask_questions(body: QuestionRequest):
+    deadline = deadline_after(body.deadline_ms or settings.ASK_DEADLINE_MS)
     questions = body.questions
+    vector_store = await asyncio.to_thread(open_collection, body.collection, False)
     try:
-        logger.info(f"Received question answering request with questions: {questions}")
+        logger.info(f"Received question answering request with {len(questions)} questions")
+        logger.debug(f"Questions: {questions}")
 
         # Check if the vector store is initialized
-        if not vector_store.is_initialized():
+        if not await asyncio.to_thread(vector_store.is_initialized):
             error_msg = "No PDF has been indexed. Please upload and index a PDF first."
             logger.warning(error_msg)
             raise HTTPException(status_code=400, detail=error_msg)
 
         logger.info("Generating responses for the questions...")
 
-        result = await generate_response(questions)
-        logger.info(f"Successfully generated responses for questions: {questions}")
+        result = await generate_response(
+            questions,
+            use_cache=body.use_cache,
+            include_timings=body.include_timings,
+            collection=body.collection,
+            retrieval_mode=body.retrieval_mode,
+            deadline=deadline,
+        )
+        logger.info(f"Successfully generated responses for {len(questions)} questions")
         return JSONResponse(status_code=200, content=result)
 
     except ValueError as e:
@@ -125,15 +324,79 @@ async def ask_questions(
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
-def start_server():
+@app.post("/ask/stream")
+async def ask_questions_stream(body: QuestionRequest):
+    deadline = deadline_after(body.deadline_ms or settings.ASK_DEADLINE_MS)
+    questions = body.questions
+    vector_store = await asyncio.to_thread(open_collection, body.collection, False)
+    logger.info(f"Received streaming question request with {len(questions)} questions")
+
+    # Check if the vector store is initialized
+    if not await asyncio.to_thread(vector_store.is_initialized):
+        error_msg = "No PDF has been indexed. Please upload and index a PDF first."
+        logger.warning(error_msg)
+        raise HTTPException(status_code=400, detail=error_msg)
+
+    async def event_stream():
+        async for event, data in stream_response(
+            questions,
+            use_cache=body.use_cache,
+            collection=body.collection,
+            retrieval_mode=body.retrieval_mode,
+            deadline=deadline,
+        ):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    logger.info("Cache stats endpoint accessed.")
+    return answer_cache_stats()
+
+
+@app.get("/grading/stats")
+def grading_stats():
+    logger.info("Grading stats endpoint accessed.")
+    return pre_grader.stats()
+
+
+def start_server(
+    reload: bool = settings.FASTAPI_RELOAD, workers: int = settings.FASTAPI_WORKERS
+):
     logger.info(
         f"Starting FastAPI server on {settings.FASTAPI_HOST}:{settings.FASTAPI_PORT}"
     )
+    if workers > 1 and settings.VECTOR_ENGINE != "flat":
+        # Each worker's Chroma client would keep serving its own stale view
+        raise ValueError("FASTAPI_WORKERS > 1 requires VECTOR_ENGINE=flat")
+    if reload:
+        # Development: a single auto-reloading process
+        uvicorn.run(
+            "app.main:app",  # Path to the FastAPI app (module:app)
+            host=settings.FASTAPI_HOST,
+            port=settings.FASTAPI_PORT,
+            reload=True,
+        )
+        return
     uvicorn.run(
-        "app.main:app",  # Path to the FastAPI app (module:app)
+        "app.main:app",
         host=settings.FASTAPI_HOST,
         port=settings.FASTAPI_PORT,
-        reload=True,  # Enable auto-reload
+        reload=False,
+        workers=workers,
     )
 
 
@@ -1,4 +1,5 @@
 import json
+import time
 
 import requests
 import streamlit as st
@@ -14,9 +15,13 @@ FASTAPI_URL = f"http://{setttings.FASTAPI_HOST}:{setttings.FASTAPI_PORT}"  # Upd
 # Streamlit App Title
 st.title("PDF Question Answering System")
 
+# Collection shared by uploads and questions
+collection = st.sidebar.text_input("Collection", value="default")
+
 # Sidebar for PDF Upload
 st.sidebar.header("Upload PDF")
 uploaded_file = st.sidebar.file_uploader("Choose a PDF file", type="pdf")
+replace = st.sidebar.checkbox("Replace a stored document of the same name")
 
 if uploaded_file is not None:
     # Send the file to the FastAPI backend
@@ -24,10 +29,29 @@ if uploaded_file is not None:
     response = requests.post(
         f"{FASTAPI_URL}/upload-pdf",
         files=files,
+        data={"collection": collection, "replace": str(replace).lower()},
     )
 
-    if response.status_code == 200:
-        st.sidebar.success("PDF uploaded and indexed successfully!")
+    if response.status_code == 202:
+        # Indexing runs in the background; poll the job until it finishes
+        job_id = response.json()["job_id"]
+        with st.sidebar.status("Indexing PDF...") as status:
+            while True:
+                job = requests.get(f"{FASTAPI_URL}/jobs/{job_id}").json()
+                progress = job.get("progress", {})
+                status.update(
+                    label=(
+                        f"Indexing PDF... {progress.get('pages_parsed', 0)} pages, "
+                        f"{progress.get('chunks_written', 0)} chunks written"
+                    )
+                )
+                if job.get("status") in ("completed", "failed"):
+                    break
+                time.sleep(1)
+        if job.get("status") == "completed":
+            st.sidebar.success("PDF uploaded and indexed successfully!")
+        else:
+            st.sidebar.error(f"Failed to index PDF: {job.get('error', 'Unknown error')}")
     else:
         st.sidebar.error(
             f"Failed to upload PDF: {response.json().get('detail', 'Unknown error')}"
@@ -41,6 +65,87 @@ questions = st.text_area(
     help="Type one question per line.",
 )
 
+stream_answers = st.checkbox("Stream answers as they are generated", value=True)
+
+
+def iter_events(response):
+    """Parse a server-sent event stream into (event, data) pairs."""
+    event, data = None, []
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[len("event:") :].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:") :].strip())
+        elif not line and event:
+            yield event, json.loads("\n".join(data) or "{}")
+            event, data = None, []
+
+
+def show_streamed_answers(question_list):
+    """Render node progress and answer tokens as they arrive."""
+    response = requests.post(
+        f"{FASTAPI_URL}/ask/stream",
+        json={"questions": question_list, "collection": collection},
+        stream=True,
+    )
+    if response.status_code != 200:
+        st.error(
+            f"Failed to get answers: {response.json().get('detail', 'Unknown error')}"
+        )
+        return None
+
+    st.subheader("Answers")
+    answers = []
+    status, placeholder, text = None, None, ""
+    for event, data in iter_events(response):
+        if event == "question":
+            st.write(f"**Q:** {data['question']}")
+            status = st.empty()
+            placeholder = st.empty()
+            text = ""
+        elif event == "progress":
+            status.caption(f"Step: {data['node']}")
+        elif event == "token":
+            text += data["token"]
+            placeholder.markdown(f"**A:** {text}")
+        elif event == "answer":
+            status.empty()
+            placeholder.markdown(f"**A:** {data['answer']}")
+            answers.append({"question": data["question"], "answer": data["answer"]})
+            st.write("---")
+        elif event == "error":
+            status.empty()
+            placeholder.error(f"Failed to answer: {data['error']}")
+            answers.append(
+                {"question": data["question"], "answer": "", "error": data["error"]}
+            )
+            st.write("---")
+    return answers
+
+
+def show_answers(question_list):
+    """Request all answers at once and render them."""
+    response = requests.post(
+        f"{FASTAPI_URL}/ask",
+        json={"questions": question_list, "collection": collection},
+    )
+
+    if response.status_code != 200:
+        st.error(
+            f"Failed to get answers: {response.json().get('detail', 'Unknown error')}"
+        )
+        return None
+
+    answers = response.json()
+    st.subheader("Answers")
+
+    for elem in answers:
+        st.write(f"**Q:** {elem.get('question', '')}")
+        st.write(f"**A:** {elem.get('answer', '')}")
+        st.write("---")
+    return answers
+
+
 if st.button("Get Answers"):
     if not questions:
         st.warning("Please enter at least one question.")
@@ -49,20 +154,12 @@ if st.button("Get Answers"):
         question_list = [q.strip() for q in questions.split("\n") if q.strip()]
 
         # Send questions to FastAPI backend
-        response = requests.post(
-            f"{FASTAPI_URL}/ask",
-            json={"questions": question_list},
-        )
-
-        if response.status_code == 200:
-            answers = response.json()
-            st.subheader("Answers")
-
-            for elem in answers:
-                st.write(f"**Q:** {elem.get('question', '')}")
-                st.write(f"**A:** {elem.get('answer', '')}")
-                st.write("---")
+        if stream_answers:
+            answers = show_streamed_answers(question_list)
+        else:
+            answers = show_answers(question_list)
 
+        if answers:
             # Option to download answers as JSON
             st.download_button(
                 label="Download Answers as JSON",
@@ -70,7 +167,3 @@ if st.button("Get Answers"):
                 file_name="answers.json",
                 mime="application/json",
             )
-        else:
-            st.error(
-                f"Failed to get answers: {response.json().get('detail', 'Unknown error')}"
-            )
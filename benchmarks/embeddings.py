@@ -0,0 +1,107 @@
+"""Compare embedding backends: throughput, memory and parity.
+
+Embeds deterministic chunk-sized texts with a candidate backend and the
+reference backend, and reports texts per second, resident memory added by
+loading each model, and the cosine agreement of the two sets of vectors.
+
+    python -m benchmarks.embeddings --candidate onnx --reference huggingface
+"""
+
+import argparse
+import json
+import random
+import time
+
+from benchmarks.synthetic_pdf import page_lines
+
+
+def current_rss_mb() -> float:
+    """Current resident set size of this process, in MiB."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def sample_texts(count: int, seed: int = 0) -> list:
+    """Chunk-sized texts built from the synthetic document's lines."""
+    rng = random.Random(seed)
+    texts = []
+    page = 0
+    while len(texts) < count:
+        lines = page_lines(rng, page)
+        for start in range(0, len(lines), 8):
+            texts.append("\n".join(lines[start : start + 8]))
+        page += 1
+    return texts[:count]
+
+
+def bench_backend(backend: str, texts: list, args) -> tuple:
+    from app.core.embeddings import get_embeddings
+
+    before = current_rss_mb()
+    start = time.perf_counter()
+    embeddings = get_embeddings(
+        backend=backend, batch_size=args.batch_size, threads=args.threads
+    )
+    load_seconds = time.perf_counter() - start
+    embeddings.embed_documents(texts[: args.batch_size])  # Warm up
+
+    start = time.perf_counter()
+    embeddings.embed_documents(texts)
+    elapsed = time.perf_counter() - start
+    return embeddings, {
+        "backend": backend,
+        "load_seconds": round(load_seconds, 3),
+        "seconds": round(elapsed, 3),
+        "texts_per_second": round(len(texts) / elapsed, 1),
+        "rss_added_mb": round(current_rss_mb() - before, 1),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidate", default="onnx")
+    parser.add_argument("--reference", default="huggingface")
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=0, help="0 = runtime default")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Optional JSON results file")
+    return parser.parse_args()
+
+
+def main():
+    from app.core.embeddings import parity_check
+
+    args = parse_args()
+    texts = sample_texts(args.texts, seed=args.seed)
+    candidate, candidate_stats = bench_backend(args.candidate, texts, args)
+    reference, reference_stats = bench_backend(args.reference, texts, args)
+    for stats in (candidate_stats, reference_stats):
+        print(
+            f"{stats['backend']:<12} {stats['texts_per_second']:>8} texts/s "
+            f"load={stats['load_seconds']}s rss+={stats['rss_added_mb']}MiB"
+        )
+    parity = parity_check(candidate, reference, texts)
+    print(
+        f"parity: mean cosine {parity['mean_cosine']}, "
+        f"min {parity['min_cosine']}, p05 {parity['p05_cosine']}"
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "args": vars(args),
+                    "candidate": candidate_stats,
+                    "reference": reference_stats,
+                    "parity": parity,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
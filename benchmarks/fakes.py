@@ -0,0 +1,129 @@
+import asyncio
+import hashlib
+import math
+import re
+import time
+from typing import Any, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+
+def _stable_fraction(text: str) -> float:
+    """Deterministic value in [0, 1) derived from the text."""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2**64
+
+
+class FakeChatModel(BaseChatModel):
+    """Offline chat model with a fixed per-call latency.
+
+    Plain calls return a short canned answer. ``with_structured_output``
+    returns deterministic Yes/No grades, roughly ``relevance`` of them Yes,
+    or simple query variants. Structured calls go through the same generate
+    path as plain ones, so callbacks see and count every call.
+    """
+
+    latency: float = 0.2
+    relevance: float = 0.5
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-latency-chat"
+
+    def _result(
+        self, messages: List[BaseMessage], schema: Optional[type] = None
+    ) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        if schema is None:
+            text = f"Answer drawn from {len(prompt)} characters of context."
+        else:
+            text = self._grade(schema, prompt).model_dump_json()
+        message = AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": len(prompt) // 4,
+                "output_tokens": len(text) // 4,
+                "total_tokens": (len(prompt) + len(text)) // 4,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        schema: Optional[type] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.latency)
+        return self._result(messages, schema)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        schema: Optional[type] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._result(messages, schema)
+
+    def _grade(self, schema, text: str):
+        if "queries" in schema.model_fields:
+            match = re.search(r"Original Question:\n(.*)\n", text)
+            question = match.group(1) if match else text
+            return schema(
+                queries=[f"{question} details", f"information about {question}"]
+            )
+        if "scores" in schema.model_fields:
+            match = re.search(r"\((\d+) values", text)
+            count = int(match.group(1)) if match else 1
+            excerpts = re.split(r"\n\[\d+\] ", text)[-count:]
+            return schema(
+                scores=[
+                    "Yes" if _stable_fraction(excerpt) < self.relevance else "No"
+                    for excerpt in excerpts
+                ]
+            )
+        return schema(score="Yes" if _stable_fraction(text) < self.relevance else "No")
+
+    def with_structured_output(self, schema, **kwargs: Any):
+        def parse(message: AIMessage):
+            return schema.model_validate_json(message.content)
+
+        return self.bind(schema=schema) | RunnableLambda(parse)
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic bag-of-words embedder using signed feature hashing.
+
+    Texts sharing words get similar vectors, so retrieval behaves sensibly
+    without downloading a model.
+    """
+
+    def __init__(self, dimensions: int = 384, **kwargs: Any):
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in _WORD_PATTERN.findall(text.lower()):
+            digest = int.from_bytes(
+                hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "big"
+            )
+            vector[digest % self.dimensions] += 1.0 if digest & (1 << 63) else -1.0
+        norm = math.sqrt(sum(value * value for value in vector))
+        return [value / norm for value in vector] if norm else vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
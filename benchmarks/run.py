@@ -0,0 +1,204 @@
+"""Offline benchmark for ingestion and question answering.
+
+Runs the real ``VectorStore`` ingestion path and the real agent ``graph`` with
+the LLM replaced by a fixed-latency fake and the embedding model replaced by a
+deterministic hashing embedder, so no network access is needed.
+
+    python -m benchmarks.run --pages 200 --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import List
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (q in [0, 100])."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MiB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def setup(args, workdir):
+    """Point the app at ``workdir`` and swap in the fake LLM and embedder."""
+    os.environ["PERSIST_DIR"] = os.path.join(workdir, "chroma_db")
+    os.environ["FLAT_INDEX_DIR"] = os.path.join(workdir, "flat_index")
+    os.environ["EMBED_CACHE_DIR"] = os.path.join(workdir, "embedding_cache")
+    os.environ["KEYWORD_INDEX_PATH"] = os.path.join(workdir, "keyword_index.json")
+
+    from app.core.graph import llm as llm_module
+    from app.core import vector_db
+    from app.core.metrics import LLMUsageCallback
+    from benchmarks.fakes import FakeChatModel, HashingEmbeddings
+
+    llm_module.get_llm = lambda temperature=0.0: FakeChatModel(
+        latency=args.llm_latency,
+        relevance=args.relevance,
+        callbacks=[LLMUsageCallback()],
+    )
+    vector_db.get_embeddings = lambda **kwargs: HashingEmbeddings()
+
+    # The graph resolves the same open handle of the default collection
+    store = vector_db.get_vector_store()
+    from app.core.graph import master_graph
+
+    return store, master_graph
+
+
+def bench_ingestion(store, args, workdir) -> dict:
+    from benchmarks.synthetic_pdf import build_pdf
+
+    pdf_path = args.pdf
+    if pdf_path is None:
+        pdf_path = os.path.join(workdir, "synthetic.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(build_pdf(args.pages, seed=args.seed))
+
+    progress = {}
+
+    def record(stage, count):
+        progress[stage] = progress.get(stage, 0) + count
+
+    start = time.perf_counter()
+    stats = store.index_pdf(pdf_path, document_name="benchmark.pdf", progress=record)
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store.index_pdf(pdf_path, document_name="benchmark.pdf")
+    unchanged_elapsed = time.perf_counter() - start
+
+    pages = progress.get("pages_parsed", 0)
+    chunks = progress.get("chunks_written", 0)
+    return {
+        "pdf": pdf_path,
+        "pages": pages,
+        "chunks": chunks,
+        "seconds": round(elapsed, 4),
+        "pages_per_second": round(pages / elapsed, 2) if elapsed else 0.0,
+        "chunks_per_second": round(chunks / elapsed, 2) if elapsed else 0.0,
+        "reindex_unchanged_seconds": round(unchanged_elapsed, 4),
+        "result": stats,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def bench_ask(master_graph, args) -> List[dict]:
+    from benchmarks.synthetic_pdf import questions
+
+    runs = []
+    combinations = [
+        (mode, batch_size, concurrency)
+        for mode in args.retrieval_modes
+        for batch_size in args.batch_sizes
+        for concurrency in args.concurrency
+    ]
+    for mode, batch_size, concurrency in combinations:
+        batch = questions(batch_size, seed=args.seed)
+        start = time.perf_counter()
+        results = asyncio.run(
+            master_graph.generate_response(
+                batch,
+                max_concurrency=concurrency,
+                use_cache=False,
+                include_timings=True,
+                retrieval_mode=mode,
+            )
+        )
+        wall = time.perf_counter() - start
+        latencies = [r["timings"]["total_seconds"] for r in results]
+        off_topic = ("", master_graph.OFF_TOPIC_ANSWER)
+        answered = [r for r in results if r["answer"] not in off_topic]
+        runs.append(
+            {
+                "retrieval_mode": mode,
+                "batch_size": batch_size,
+                "concurrency": concurrency,
+                "wall_seconds": round(wall, 4),
+                "questions_per_second": round(batch_size / wall, 2),
+                "latency_p50": round(percentile(latencies, 50), 4),
+                "latency_p90": round(percentile(latencies, 90), 4),
+                "latency_p99": round(percentile(latencies, 99), 4),
+                "latency_mean": round(statistics.fmean(latencies), 4),
+                "llm_calls": sum(r["timings"].get("llm_calls", 0) for r in results),
+                "errors": sum(1 for r in results if r.get("error")),
+                "answer_rate": round(len(answered) / batch_size, 3),
+            }
+        )
+        print(
+            f"mode={mode:<8} batch={batch_size:<4} concurrency={concurrency:<4} "
+            f"wall={wall:.3f}s p50={runs[-1]['latency_p50']:.3f}s "
+            f"p99={runs[-1]['latency_p99']:.3f}s answered={runs[-1]['answer_rate']:.0%}"
+        )
+    return runs
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=100, help="Synthetic PDF pages")
+    parser.add_argument("--pdf", default=None, help="Benchmark this PDF instead")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per fake LLM call")
+    parser.add_argument("--relevance", type=float, default=0.5, help="Share of chunks graded Yes")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument(
+        "--retrieval-modes", nargs="+", default=["rewrite"], choices=["rewrite", "fusion"]
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_output.json", help="JSON results file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="agenticrag-bench-") as workdir:
+        store, master_graph = setup(args, workdir)
+        ingestion = bench_ingestion(store, args, workdir)
+        print(
+            f"ingestion: {ingestion['pages']} pages, {ingestion['chunks']} chunks "
+            f"in {ingestion['seconds']}s ({ingestion['pages_per_second']} pages/s)"
+        )
+        ask = bench_ask(master_graph, args)
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "ingestion": ingestion,
+        "ask": ask,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
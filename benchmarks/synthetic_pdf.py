@@ -0,0 +1,99 @@
+import random
+from typing import List
+
+TOPICS = [
+    "vacation policy",
+    "expense reports",
+    "printer maintenance",
+    "network outage",
+    "firmware update",
+    "safety inspection",
+    "warranty claim",
+    "battery replacement",
+]
+
+WORDS = (
+    "the system operator should verify configuration before restarting service "
+    "each unit reports status through the control panel and logs warnings "
+    "employees submit requests to their manager who approves within five days "
+    "calibration requires a certified technician and the reference gauge"
+).split()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def page_lines(rng: random.Random, page: int, lines: int = 45) -> List[str]:
+    """Deterministic lines of text for one page."""
+    topic = TOPICS[page % len(TOPICS)]
+    result = [f"Section {page + 1}: {topic}"]
+    for line in range(lines - 1):
+        words = rng.choices(WORDS, k=10)
+        if line % 7 == 0:
+            words.append(f"code ERR-{rng.randint(100, 999)}")
+        if line % 5 == 0:
+            words.append(topic)
+        result.append(" ".join(words))
+    return result
+
+
+def build_pdf(pages: int, seed: int = 0) -> bytes:
+    """Build a text-only PDF with ``pages`` pages of deterministic content."""
+    rng = random.Random(seed)
+    objects = []  # Object bodies, numbered from 1
+
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(b"")  # Pages tree, filled in once the kids are known
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    kids = []
+    for page in range(pages):
+        text = " T* ".join(f"({_escape(line)}) Tj" for line in page_lines(rng, page))
+        stream = f"BT /F1 10 Tf 12 TL 40 800 Td {text} ET".encode("latin-1")
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+        content_number = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % content_number
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids),
+        pages,
+    )
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(output)
+
+
+def questions(count: int, seed: int = 0) -> List[str]:
+    """Deterministic questions about the synthetic document."""
+    rng = random.Random(seed)
+    templates = [
+        "What does the document say about {topic}?",
+        "How should the operator handle {topic}?",
+        "Who approves requests related to {topic}?",
+        "What does error code ERR-{code} mean?",
+    ]
+    return [
+        rng.choice(templates).format(
+            topic=rng.choice(TOPICS), code=rng.randint(100, 999)
+        )
+        for _ in range(count)
+    ]
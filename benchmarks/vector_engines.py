@@ -0,0 +1,139 @@
+"""Compare vector engines: write throughput, open cost, query latency and recall.
+
+Stores the same random normalized vectors in Chroma and in the flat
+memory-mapped index, then reports write throughput, the time and memory a
+fresh process needs to open each collection and answer a first query,
+single-query latency percentiles, batched multi-query throughput, and
+recall@k against exact brute-force search.
+
+    python -m benchmarks.vector_engines --chunks 20000 --dim 384
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.embeddings import current_rss_mb
+from benchmarks.run import percentile
+
+ENGINES = ("chroma", "flat")
+
+
+def open_engine(engine: str, directory: str):
+    from app.core.flat_index import FlatIndex
+    from app.core.vector_db import ChromaEngine
+
+    if engine == "flat":
+        return FlatIndex(os.path.join(directory, "bench"), dtype=os.environ["BENCH_DTYPE"])
+    return ChromaEngine("bench", directory, embedding_function=None)
+
+
+def probe_open(engine: str, directory: str, query: list) -> dict:
+    """Open the collection in a fresh process and answer one query."""
+    import app.core.vector_db  # noqa: F401  Imports are not part of the open cost
+
+    before = current_rss_mb()
+    start = time.perf_counter()
+    store = open_engine(engine, directory)
+    opened = time.perf_counter() - start
+    store.query([query], k=10)
+    return {
+        "open_seconds": round(opened, 4),
+        "first_query_seconds": round(time.perf_counter() - start, 4),
+        "rss_added_mb": round(current_rss_mb() - before, 1),
+    }
+
+
+def bench_engine(engine: str, vectors: np.ndarray, queries: np.ndarray, exact, args) -> dict:
+    directory = tempfile.mkdtemp(prefix=f"agenticrag-{engine}-")
+    store = open_engine(engine, directory)
+    ids = [f"{i // 50:016x}:0:{i}:{i:016x}" for i in range(len(vectors))]
+
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), args.batch_size):
+        batch = slice(offset, offset + args.batch_size)
+        store.upsert(
+            ids[batch],
+            vectors[batch].tolist(),
+            [{"document_id": chunk_id[:16]} for chunk_id in ids[batch]],
+            [f"chunk {chunk_id}" for chunk_id in ids[batch]],
+        )
+    write_seconds = time.perf_counter() - start
+
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        opened = pool.apply(probe_open, (engine, directory, queries[0].tolist()))
+
+    latencies, hits = [], 0
+    for query, truth in zip(queries, exact):
+        start = time.perf_counter()
+        (found,) = store.query([query.tolist()], k=args.k)
+        latencies.append(time.perf_counter() - start)
+        hits += len({doc.id for doc, _ in found} & {ids[row] for row in truth})
+
+    start = time.perf_counter()
+    for offset in range(0, len(queries), args.multi_query):
+        store.query(queries[offset : offset + args.multi_query].tolist(), k=args.k)
+    batched_seconds = time.perf_counter() - start
+
+    return {
+        "engine": engine,
+        "writes_per_second": round(len(vectors) / write_seconds, 1),
+        **opened,
+        "query_p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "query_p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "single_queries_per_second": round(len(latencies) / sum(latencies), 1),
+        "batched_queries_per_second": round(len(queries) / batched_seconds, 1),
+        f"recall_at_{args.k}": round(hits / (len(queries) * args.k), 4),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Chunks per write")
+    parser.add_argument("--multi-query", type=int, default=4, help="Queries per batched search")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=ENGINES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Optional JSON results file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    os.environ["BENCH_DTYPE"] = args.dtype  # Read by the spawned probe too
+    rng = np.random.default_rng(args.seed)
+    vectors = rng.normal(size=(args.chunks, args.dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    # Queries near stored vectors, like real questions near their answers
+    queries = vectors[rng.choice(args.chunks, args.queries)] + rng.normal(
+        scale=0.05, size=(args.queries, args.dim)
+    ).astype(np.float32)
+    exact = np.argsort(-(queries @ vectors.T), axis=1)[:, : args.k]
+
+    results = []
+    for engine in args.engines:
+        stats = bench_engine(engine, vectors, queries, exact, args)
+        results.append(stats)
+        print(
+            f"{engine:<7} writes={stats['writes_per_second']}/s "
+            f"open={stats['open_seconds']}s first_query={stats['first_query_seconds']}s "
+            f"rss+={stats['rss_added_mb']}MiB p50={stats['query_p50_ms']}ms "
+            f"p99={stats['query_p99_ms']}ms batched={stats['batched_queries_per_second']}q/s "
+            f"recall@{args.k}={stats[f'recall_at_{args.k}']}"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "engines": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
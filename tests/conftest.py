@@ -0,0 +1,23 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+# Settings are read when the app is first imported, so test modules import
+# the app inside fixtures and tests only
+os.environ.setdefault("LOG_FILE", "")
+
+
+@pytest.fixture(scope="session")
+def store_and_graph(tmp_path_factory):
+    """The default collection, indexed from a small synthetic PDF, and the
+    agent graph module, with the offline fake LLM and embedder."""
+    from benchmarks.run import setup
+    from benchmarks.synthetic_pdf import build_pdf
+
+    workdir = tmp_path_factory.mktemp("agenticrag")
+    store, master_graph = setup(SimpleNamespace(llm_latency=0.0, relevance=1.0), str(workdir))
+    pdf_path = workdir / "synthetic.pdf"
+    pdf_path.write_bytes(build_pdf(4))
+    store.index_pdf(str(pdf_path), document_name="synthetic.pdf")
+    return store, master_graph
@@ -0,0 +1,23 @@
+import asyncio
+
+
+def test_retrieval_modes_do_not_share_cached_answers(store_and_graph, monkeypatch):
+    _, master_graph = store_and_graph
+    runs = []
+    run_graph = master_graph.run_graph
+
+    async def counting_run_graph(question, collection, version, retrieval_mode, deadline=None):
+        runs.append(retrieval_mode)
+        return await run_graph(question, collection, version, retrieval_mode, deadline)
+
+    monkeypatch.setattr(master_graph, "run_graph", counting_run_graph)
+    question = "How do I file a warranty claim?"
+
+    for mode in ["rewrite", "fusion", "rewrite", "fusion"]:
+        [result] = asyncio.run(
+            master_graph.generate_response([question], retrieval_mode=mode)
+        )
+        assert result["answer"] and "error" not in result
+
+    # Each mode runs its own graph once, then answers from its own cache
+    assert runs == ["rewrite", "fusion"]
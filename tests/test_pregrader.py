@@ -0,0 +1,29 @@
+import pytest
+
+CROSS_ENCODER = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+@pytest.fixture(scope="module")
+def pre_grader():
+    pytest.importorskip("sentence_transformers")
+    from app.core.graph.pregrader import TieredPreGrader
+
+    grader = TieredPreGrader(cross_encoder_model=CROSS_ENCODER)
+    try:
+        grader._get_cross_encoder()
+    except OSError as e:
+        pytest.skip(f"{CROSS_ENCODER} is not available: {e}")
+    return grader
+
+
+def test_cross_encoder_scores_fall_on_both_sides_of_the_thresholds(pre_grader):
+    question = "How many days of paid vacation do employees get?"
+    docs = [
+        "Full-time employees receive 25 days of paid vacation per calendar year.",
+        "The printer toner cartridge is replaced by opening the front panel.",
+    ]
+    relevant, irrelevant = pre_grader.local_scores(question, docs, [None, None])
+
+    assert relevant >= pre_grader.accept
+    assert irrelevant <= pre_grader.reject
+    assert pre_grader.grade(question, docs, [None, None]) == ["Yes", "No"]